@@ -0,0 +1,209 @@
+"""
+Batch API Helpers for Manufacturing Part Analyzer
+
+Builds and reads the JSONL files used by the Azure OpenAI Batch API, and
+provides LocalBatchClient, a file-based stand-in for the client's `files` and
+`batches` endpoints so the submit/poll/collect workflow can be run offline.
+"""
+
+import json
+import time
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, Optional
+
+
+# Endpoint used for chat completion batches on Azure OpenAI
+BATCH_ENDPOINT = "/chat/completions"
+
+# Statuses after which a batch will not change any more
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Azure OpenAI limits for a batch input file
+BATCH_MAX_FILE_BYTES = 200 * 1024 * 1024
+BATCH_MAX_REQUESTS = 100000
+
+
+def batch_request_line(custom_id: str, params: Dict) -> str:
+    """
+    One line of a batch input file
+
+    Args:
+        custom_id: Identifier echoed back on the matching output line
+        params: chat.completions.create parameters (model is the batch deployment)
+
+    Returns:
+        JSON line including the trailing newline
+    """
+    return json.dumps({
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": params
+    }) + "\n"
+
+
+def parse_batch_output(text: str) -> Dict[str, Dict]:
+    """
+    Index the lines of a batch output or error file by custom_id
+
+    Args:
+        text: JSONL file content
+
+    Returns:
+        Dictionary of custom_id to output line
+    """
+    outputs = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        outputs[record.get("custom_id")] = record
+    return outputs
+
+
+def empty_response(body: Dict) -> str:
+    """
+    Offline reply used by LocalBatchClient when no responder is given
+
+    Args:
+        body: Request body from the batch input file
+
+    Returns:
+        JSON reply with every field of the requested schema empty or 0
+    """
+    response_format = body.get("response_format") or {}
+    schema = response_format.get("json_schema", {}).get("schema", {})
+    reply = {}
+    for field, spec in schema.get("properties", {}).items():
+        reply[field] = 0 if spec.get("type") in ("integer", "number") else ""
+    return json.dumps(reply)
+
+
+class LocalBatchClient:
+    """
+    File-based stand-in for the Batch API parts of the OpenAI client
+
+    Uploaded files are stored in a directory. A batch is processed when it is
+    created, by passing every request body to `responder`, and reports
+    "in_progress" for the first `polls_until_complete` status checks.
+    """
+
+    def __init__(self, storage_dir: str = ".local_batches",
+                 responder: Optional[Callable[[Dict], str]] = None, polls_until_complete: int = 1):
+        """
+        Initialize the stand-in
+
+        Args:
+            storage_dir: Directory holding uploaded, output and batch status files
+            responder: Function from a request body to the reply text (defaults to
+                       empty_response); exceptions become failed requests. Pass
+                       e.g. a function calling a regular deployment to get real answers.
+            polls_until_complete: Status checks that report "in_progress" before "completed"
+        """
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.responder = responder or empty_response
+        self.polls_until_complete = polls_until_complete
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    def _store(self, data: bytes) -> str:
+        file_id = f"file-{uuid.uuid4().hex}"
+        (self.storage_dir / file_id).write_bytes(data)
+        return file_id
+
+    def _create_file(self, file, purpose: str):
+        data = file.read() if hasattr(file, "read") else Path(file).read_bytes()
+        file_id = self._store(data if isinstance(data, bytes) else data.encode())
+        return SimpleNamespace(id=file_id, purpose=purpose, bytes=len(data))
+
+    def _file_content(self, file_id: str):
+        return SimpleNamespace(text=(self.storage_dir / file_id).read_text())
+
+    def _create_batch(self, input_file_id: str, endpoint: str, completion_window: str = "24h", **kwargs):
+        outputs, errors = [], []
+        counts = {"total": 0, "completed": 0, "failed": 0}
+
+        for line in (self.storage_dir / input_file_id).read_text().splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            counts["total"] += 1
+            request_id = uuid.uuid4().hex
+            try:
+                content = self.responder(request["body"])
+            except Exception as e:
+                counts["failed"] += 1
+                errors.append({
+                    "id": f"batch_req_{request_id}",
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 500, "request_id": request_id,
+                                 "body": {"error": {"message": str(e), "code": "server_error"}}},
+                    "error": None
+                })
+                continue
+            counts["completed"] += 1
+            outputs.append({
+                "id": f"batch_req_{request_id}",
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "request_id": request_id,
+                    "body": {
+                        "id": f"chatcmpl-{request_id}",
+                        "object": "chat.completion",
+                        "model": request["body"].get("model"),
+                        "choices": [{
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": content}
+                        }]
+                    }
+                },
+                "error": None
+            })
+
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex}",
+            "endpoint": endpoint,
+            "completion_window": completion_window,
+            "input_file_id": input_file_id,
+            "created_at": int(time.time()),
+            "output_file_id": self._store("".join(json.dumps(o) + "\n" for o in outputs).encode()),
+            "error_file_id": self._store("".join(json.dumps(e) + "\n" for e in errors).encode()) if errors else None,
+            "request_counts": counts,
+            "polls_remaining": self.polls_until_complete
+        }
+        self._save_batch(batch)
+        return self._batch_view(batch, "validating")
+
+    def _retrieve_batch(self, batch_id: str):
+        path = self.storage_dir / f"{batch_id}.json"
+        batch = json.loads(path.read_text())
+        if batch["polls_remaining"] > 0:
+            batch["polls_remaining"] -= 1
+            self._save_batch(batch)
+            return self._batch_view(batch, "in_progress")
+        return self._batch_view(batch, "completed")
+
+    def _save_batch(self, batch: Dict):
+        (self.storage_dir / f"{batch['id']}.json").write_text(json.dumps(batch))
+
+    def _batch_view(self, batch: Dict, status: str):
+        done = status == "completed"
+        return SimpleNamespace(
+            id=batch["id"],
+            status=status,
+            endpoint=batch["endpoint"],
+            input_file_id=batch["input_file_id"],
+            output_file_id=batch["output_file_id"] if done else None,
+            error_file_id=batch["error_file_id"] if done else None,
+            request_counts=SimpleNamespace(**batch["request_counts"]) if done
+            else SimpleNamespace(total=batch["request_counts"]["total"], completed=0, failed=0),
+            errors=None
+        )
@@ -0,0 +1,196 @@
+"""
+Page Encoding Benchmark for Manufacturing Part Analyzer
+
+Compares the original PIL round-trip (pixmap -> PIL Image -> PNG via BytesIO)
+against encoding PyMuPDF pixmaps directly to compressed bytes. Each path runs
+in its own subprocess so peak RSS is measured independently. Also compares
+payload size and render/encode time across the analyzer's color modes.
+
+Usage:
+    python benchmark_encoding.py [drawing.pdf] [--dpi 300] [--format PNG]
+
+If no PDF is given, a synthetic D-size (34" x 22") line drawing is generated.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from manufacturing_part_analyzer import ManufacturingPartAnalyzer
+
+
+def create_synthetic_drawing(output_file, pages=1):
+    """
+    Create a D-size line drawing PDF for benchmarking
+
+    Args:
+        output_file: Path to save the PDF
+        pages: Number of sheets to generate
+    """
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page(width=34 * 72, height=22 * 72)
+        page.draw_rect(fitz.Rect(36, 36, 34 * 72 - 36, 22 * 72 - 36), width=2)
+        for i in range(60):
+            x = 100 + i * 38
+            page.draw_line((x, 150), (x + 200, 1300), width=0.5)
+            page.draw_circle((x + 50, 800), 20, width=0.7)
+        page.insert_text((1900, 1450), f"TITLE: BENCHMARK SHEET {page_num + 1}\nMATERIAL: STEEL",
+                         fontsize=14)
+    doc.save(output_file)
+    doc.close()
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def run_path(path, pdf_file, dpi, image_format):
+    """
+    Encode every page of a PDF using one path and report timing and memory
+
+    Args:
+        path: "pil" for the PIL round-trip, "direct" for pixmap encoding
+        pdf_file: PDF to encode
+        dpi: Render resolution
+        image_format: Image format to encode
+
+    Returns:
+        Dictionary with wall time, peak RSS and payload size
+    """
+    # Encoding never touches the network, so placeholder credentials are fine
+    analyzer = ManufacturingPartAnalyzer(azure_endpoint="https://localhost", api_key="benchmark")
+    baseline_rss = peak_rss_mb()
+    payload_bytes = 0
+
+    start = time.perf_counter()
+    doc = fitz.open(pdf_file)
+    mat = fitz.Matrix(dpi/72, dpi/72)
+    for page in doc:
+        pix = page.get_pixmap(matrix=mat)
+        if path == "pil":
+            encoded = analyzer.image_to_base64(analyzer.pixmap_to_image(pix), format=image_format)
+        else:
+            encoded = analyzer.pixmap_to_base64(pix, format=image_format)
+        payload_bytes += len(encoded)
+        del pix, encoded
+    doc.close()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "path": path,
+        "wall_time_s": elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_delta_mb": peak_rss_mb() - baseline_rss,
+        "payload_bytes": payload_bytes,
+    }
+
+
+def compare_color_modes(pdf_file, dpi):
+    """
+    Render and encode a PDF in every color mode
+
+    Args:
+        pdf_file: PDF to encode
+        dpi: Render resolution
+
+    Returns:
+        List of dictionaries with color mode, wall time and payload size
+    """
+    results = []
+    for color_mode in ManufacturingPartAnalyzer.COLOR_MODES:
+        analyzer = ManufacturingPartAnalyzer(azure_endpoint="https://localhost", api_key="benchmark",
+                                             color_mode=color_mode)
+        payload_bytes = 0
+        start = time.perf_counter()
+        for page in analyzer.iter_pages(pdf_file, dpi=dpi):
+            payload_bytes += len(analyzer.pixmap_to_base64(page.pixmap))
+            page.pixmap = None
+        results.append({
+            "color_mode": color_mode,
+            "wall_time_s": time.perf_counter() - start,
+            "payload_bytes": payload_bytes,
+        })
+    return results
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark page encoding paths')
+    parser.add_argument('pdf', nargs='?', help='PDF to benchmark (default: synthetic D-size sheet)')
+    parser.add_argument('--dpi', type=int, default=300, help='Render resolution (default: 300)')
+    parser.add_argument('--format', default='PNG', help='Image format (default: PNG)')
+    parser.add_argument('--pages', type=int, default=1, help='Pages in the synthetic drawing (default: 1)')
+    parser.add_argument('--path', choices=['pil', 'direct'], help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    # Child mode: run a single path and report as JSON
+    if args.path:
+        print(json.dumps(run_path(args.path, args.pdf, args.dpi, args.format)))
+        return
+
+    pdf_file = args.pdf
+    cleanup = None
+    if not pdf_file:
+        handle, pdf_file = tempfile.mkstemp(suffix='.pdf')
+        os.close(handle)
+        cleanup = pdf_file
+        create_synthetic_drawing(pdf_file, pages=args.pages)
+
+    try:
+        results = []
+        for path in ('pil', 'direct'):
+            output = subprocess.run(
+                [sys.executable, __file__, pdf_file, '--dpi', str(args.dpi),
+                 '--format', args.format, '--path', path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+        color_results = compare_color_modes(pdf_file, args.dpi)
+    finally:
+        if cleanup:
+            os.remove(cleanup)
+
+    print("\n" + "=" * 80)
+    print(f"PAGE ENCODING BENCHMARK ({args.dpi} DPI, {args.format})")
+    print("=" * 80)
+    print(f"{'Path':<12} {'Wall (s)':<12} {'Peak RSS (MB)':<16} {'RSS delta (MB)':<16} {'Payload (MB)':<12}")
+    print("-" * 80)
+    for r in results:
+        print(f"{r['path']:<12} {r['wall_time_s']:<12.2f} {r['peak_rss_mb']:<16.1f} "
+              f"{r['peak_rss_delta_mb']:<16.1f} {r['payload_bytes'] / 1e6:<12.2f}")
+    print("-" * 80)
+
+    pil, direct = results
+    if direct['wall_time_s'] > 0:
+        print(f"Speedup: {pil['wall_time_s'] / direct['wall_time_s']:.2f}x")
+    print(f"Peak RSS saved: {pil['peak_rss_mb'] - direct['peak_rss_mb']:.1f} MB")
+    print("=" * 80)
+
+    print("\n" + "=" * 80)
+    print(f"COLOR MODE COMPARISON ({args.dpi} DPI, PNG)")
+    print("=" * 80)
+    print(f"{'Mode':<12} {'Wall (s)':<12} {'Payload (MB)':<16} {'vs rgb':<10}")
+    print("-" * 80)
+    rgb_bytes = color_results[0]['payload_bytes']
+    for r in color_results:
+        print(f"{r['color_mode']:<12} {r['wall_time_s']:<12.2f} {r['payload_bytes'] / 1e6:<16.2f} "
+              f"{r['payload_bytes'] / rgb_bytes * 100:>6.1f}%")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Validation Benchmark for Manufacturing Part Analyzer
+
+Times calculate_accuracy, which matches predictions to ground truth through a
+dictionary of normalized part IDs, against the previous approach of
+normalizing the whole Part ID column and scanning it for every prediction.
+
+Usage:
+    python benchmark_validation.py [--sizes 1000 10000 100000] [--scan-sample 200]
+
+The scan takes O(predictions x ground-truth rows), so it is timed on
+--scan-sample predictions and extrapolated to the full set.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from validate_accuracy import calculate_accuracy, create_process_map, initialize_parameters, normalize_part_id
+
+
+def create_synthetic_data(rows, seed=0):
+    """
+    Create matching ground truth rows and predictions
+
+    Args:
+        rows: Number of parts
+        seed: Random seed
+
+    Returns:
+        Tuple of (ground truth DataFrame, list of prediction dictionaries)
+    """
+    rng = np.random.default_rng(seed)
+    process_map = create_process_map()
+    part_ids = [f"PN-{i:06d}" for i in range(rows)]
+
+    ground_truth = pd.DataFrame({
+        'Part ID': part_ids,
+        'Complexity Level': rng.choice(['Simple', 'Moderate', 'Complex'], rows),
+        'Type': rng.choice(['Bracket', 'Plate', 'Shaft'], rows),
+        'Material': rng.choice(['Steel', 'Aluminum', 'Stainless Steel'], rows),
+    })
+    for column in initialize_parameters()[3:]:
+        ground_truth[column] = rng.integers(0, 2, rows).astype(bool)
+
+    flags = rng.integers(0, 2, (rows, len(process_map)))
+    predictions = []
+    for i, part_id in enumerate(part_ids):
+        pred = {key: int(flag) for key, flag in zip(process_map, flags[i])}
+        pred.update(complexity_level='Simple', type='Bracket', material='Steel',
+                    source_file=f"{part_id}_drw.pdf")
+        predictions.append(pred)
+    # Shuffle so matches are not in table order
+    order = rng.permutation(rows)
+    return ground_truth, [predictions[i] for i in order]
+
+
+def scan_matches(predictions, ground_truth_df):
+    """
+    Match predictions the way calculate_accuracy used to: normalize and scan per prediction
+
+    Args:
+        predictions: List of prediction dictionaries
+        ground_truth_df: DataFrame with ground truth values
+
+    Returns:
+        Number of predictions with a matching row
+    """
+    matched = 0
+    for pred in predictions:
+        part_id = normalize_part_id(pred.get('part_identifier') or pred.get('part_name') or
+                                    pred.get('source_file', ''))
+        matches = ground_truth_df[ground_truth_df['Part ID'].astype(str).apply(normalize_part_id) == part_id]
+        if len(matches) > 0:
+            matched += 1
+            matches.iloc[0]
+    return matched
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark prediction matching in validate_accuracy')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Numbers of parts to benchmark (default: 1000 10000 100000)')
+    parser.add_argument('--scan-sample', type=int, default=200,
+                        help='Predictions timed with the per-prediction scan (default: 200)')
+
+    args = parser.parse_args()
+    process_map = create_process_map()
+
+    print("\n" + "=" * 80)
+    print("VALIDATION MATCHING BENCHMARK")
+    print("=" * 80)
+    print(f"{'Rows':<10} {'Indexed (s)':<14} {'Scan (s, est.)':<16} {'Scan per pred (ms)':<20} {'Speedup':<10}")
+    print("-" * 80)
+
+    for rows in args.sizes:
+        ground_truth, predictions = create_synthetic_data(rows)
+
+        start = time.perf_counter()
+        stats = calculate_accuracy(predictions, ground_truth, process_map)
+        indexed = time.perf_counter() - start
+        assert stats['Laser Cut']['total'] == rows
+
+        sample = predictions[:min(rows, args.scan_sample)]
+        start = time.perf_counter()
+        assert scan_matches(sample, ground_truth) == len(sample)
+        per_prediction = (time.perf_counter() - start) / len(sample)
+        scan = per_prediction * rows
+
+        print(f"{rows:<10} {indexed:<14.2f} {scan:<16.1f} {per_prediction * 1000:<20.2f} "
+              f"{scan / indexed:>8.0f}x")
+
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
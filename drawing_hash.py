@@ -0,0 +1,290 @@
+"""
+Perceptual Hashing for Manufacturing Part Analyzer
+
+Revisions and dash-number variants of a drawing usually differ only in a few
+title-block characters, so their downsampled renders are nearly identical.
+This module computes difference hashes (dHash) and DCT hashes (pHash) of the
+first sheet with NumPy, and keeps them in an index that finds the closest
+prior drawing by Hamming distance with one vectorized pass over all hashes.
+
+A 256-pixel render cannot see note text, so each entry also carries a key
+(the analyzer's digest of the drawing's non-title-block text and settings),
+and a lookup only considers entries with the same key.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+import numpy as np
+
+
+HASH_METHODS = ("dhash", "phash")
+
+# Longest edge of the gray render that is averaged down before hashing
+HASH_RENDER_EDGE = 256
+
+# Set-bit counts of every byte value, for NumPy versions without bitwise_count
+POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def area_resize(gray: np.ndarray, rows: int, cols: int) -> np.ndarray:
+    """
+    Downsample a gray image by averaging the pixels that fall in each output cell
+
+    Args:
+        gray: 2-D array of gray levels (at least rows x cols)
+        rows: Output height
+        cols: Output width
+
+    Returns:
+        rows x cols float array
+    """
+    row_edges = np.linspace(0, gray.shape[0], rows + 1).astype(int)
+    col_edges = np.linspace(0, gray.shape[1], cols + 1).astype(int)
+    sums = np.add.reduceat(np.add.reduceat(gray.astype(np.float64), row_edges[:-1], axis=0),
+                           col_edges[:-1], axis=1)
+    counts = np.outer(np.diff(row_edges), np.diff(col_edges))
+    return sums / counts
+
+
+def dhash(gray: np.ndarray, hash_size: int = 16) -> np.ndarray:
+    """
+    Difference hash: whether each cell is brighter than its right-hand neighbour
+
+    Args:
+        gray: 2-D array of gray levels
+        hash_size: Hash grid size; the hash has hash_size**2 bits
+
+    Returns:
+        Packed hash bits as a uint8 array
+    """
+    cells = area_resize(gray, hash_size, hash_size + 1)
+    return np.packbits(cells[:, 1:] > cells[:, :-1])
+
+
+def phash(gray: np.ndarray, hash_size: int = 16) -> np.ndarray:
+    """
+    DCT hash: low-frequency DCT coefficients compared with their median
+
+    Args:
+        gray: 2-D array of gray levels
+        hash_size: Hash grid size; the hash has hash_size**2 bits
+
+    Returns:
+        Packed hash bits as a uint8 array
+    """
+    size = hash_size * 4
+    cells = area_resize(gray, size, size)
+    # DCT-II basis; scaling does not matter for a median threshold
+    n = np.arange(size)
+    basis = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size))
+    low = (basis @ cells @ basis.T)[:hash_size, :hash_size]
+    # The DC term only reflects overall brightness, so leave it out of the median
+    return np.packbits(low > np.median(low.flatten()[1:]))
+
+
+def page_gray(page: fitz.Page, edge: int = HASH_RENDER_EDGE) -> np.ndarray:
+    """
+    Render a page in gray with its longest edge at `edge` pixels
+
+    Args:
+        page: PyMuPDF page
+        edge: Longest edge of the render in pixels
+
+    Returns:
+        2-D uint8 array
+    """
+    zoom = edge / max(page.rect.width, page.rect.height)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+
+
+def drawing_hash(pdf_path: str, method: str = "dhash", hash_size: int = 16) -> np.ndarray:
+    """
+    Perceptual hash of a drawing's first sheet
+
+    Args:
+        pdf_path: Path to PDF file
+        method: "dhash" or "phash"
+        hash_size: Hash grid size; the hash has hash_size**2 bits
+
+    Returns:
+        Packed hash bits as a uint8 array
+    """
+    with fitz.open(pdf_path) as doc:
+        gray = page_gray(doc[0], max(HASH_RENDER_EDGE, hash_size * 4))
+    if method == "phash":
+        return phash(gray, hash_size)
+    return dhash(gray, hash_size)
+
+
+def hamming_distances(hashes: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    Hamming distance from one hash to many
+
+    Args:
+        hashes: n x bytes array of packed hashes
+        query: Packed hash to compare against
+
+    Returns:
+        Array of n distances in bits
+    """
+    diff = np.bitwise_xor(hashes, query)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(diff).sum(axis=1, dtype=np.int64)
+    return POPCOUNT[diff].sum(axis=1, dtype=np.int64)
+
+
+class DrawingHashIndex:
+    """
+    Perceptual hashes of analyzed drawings with nearest-neighbour lookup by Hamming distance
+
+    Hashes live in one contiguous uint8 matrix, so a lookup is a single
+    vectorized XOR and popcount over every entry (or over the entries that
+    share the query's key).
+    """
+
+    def __init__(self, path: Optional[str] = None, method: str = "dhash", hash_size: int = 16):
+        """
+        Initialize the index, loading it from `path` if that file exists
+
+        Args:
+            path: .npz file the index is loaded from and saved to (None keeps it in memory)
+            method: "dhash" or "phash"
+            hash_size: Hash grid size; hashes have hash_size**2 bits
+        """
+        if method not in HASH_METHODS:
+            raise ValueError(f"method must be one of {HASH_METHODS}, got {method!r}")
+        self.path = Path(path) if path is not None else None
+        self.method = method
+        self.hash_size = hash_size
+        self.hashes = np.zeros((0, hash_size * hash_size // 8), dtype=np.uint8)
+        self.count = 0
+        self.names: List[str] = []
+        self.results: List[Optional[Dict]] = []
+        self.keys: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.key_positions: Dict[str, List[int]] = {}
+        self.lock = threading.Lock()
+
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def hash_drawing(self, pdf_path: str) -> np.ndarray:
+        """
+        Hash a drawing with this index's method and size
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            Packed hash bits
+        """
+        return drawing_hash(pdf_path, self.method, self.hash_size)
+
+    def add(self, drawing_hash: np.ndarray, source_file: str, result: Optional[Dict] = None, key: str = ""):
+        """
+        Add a drawing to the index, replacing any earlier entry with the same name
+
+        Args:
+            drawing_hash: Packed hash from hash_drawing
+            source_file: Drawing file name
+            result: Analysis result to reuse for near-duplicates
+            key: Only lookups with this key can match the entry
+        """
+        with self.lock:
+            position = self.positions.get(source_file)
+            if position is not None:
+                self.hashes[position] = drawing_hash
+                self.results[position] = result
+                if self.keys[position] != key:
+                    self.key_positions[self.keys[position]].remove(position)
+                    self.key_positions.setdefault(key, []).append(position)
+                    self.keys[position] = key
+                return
+            # Grow the matrix geometrically so adds stay amortized O(1)
+            if self.count == len(self.hashes):
+                grown = np.zeros((max(1024, 2 * len(self.hashes)), self.hashes.shape[1]), dtype=np.uint8)
+                grown[:self.count] = self.hashes[:self.count]
+                self.hashes = grown
+            self.hashes[self.count] = drawing_hash
+            self.positions[source_file] = self.count
+            self.key_positions.setdefault(key, []).append(self.count)
+            self.count += 1
+            self.names.append(source_file)
+            self.results.append(result)
+            self.keys.append(key)
+
+    def nearest(self, drawing_hash: np.ndarray, max_distance: Optional[int] = None,
+                key: Optional[str] = None) -> Optional[Tuple[str, int, Optional[Dict]]]:
+        """
+        Find the closest indexed drawing
+
+        Args:
+            drawing_hash: Packed hash from hash_drawing
+            max_distance: Largest Hamming distance accepted (None for any)
+            key: Only consider entries added with this key (None for all entries)
+
+        Returns:
+            Tuple of (source_file, distance, stored result), or None if no entry
+            is eligible or nothing is within max_distance
+        """
+        with self.lock:
+            if key is None:
+                candidates = np.arange(self.count)
+                hashes = self.hashes[:self.count]
+            else:
+                candidates = np.array(self.key_positions.get(key, []), dtype=np.int64)
+                hashes = self.hashes[candidates]
+            if len(candidates) == 0:
+                return None
+            distances = hamming_distances(hashes, drawing_hash)
+            best = int(np.argmin(distances))
+            position = int(candidates[best])
+            distance = int(distances[best])
+            if max_distance is not None and distance > max_distance:
+                return None
+            return self.names[position], distance, self.results[position]
+
+    def save(self, path: Optional[str] = None):
+        """
+        Write the index to an .npz file
+
+        Args:
+            path: Destination (defaults to the path the index was created with)
+        """
+        path = Path(path) if path is not None else self.path
+        with self.lock:
+            with open(path, 'wb') as f:
+                np.savez_compressed(
+                    f,
+                    hashes=self.hashes[:self.count],
+                    names=np.array(self.names, dtype=str),
+                    results=np.array([json.dumps(result) for result in self.results], dtype=str),
+                    keys=np.array(self.keys, dtype=str),
+                    settings=np.array([self.method, str(self.hash_size)])
+                )
+
+    def load(self):
+        """Read the index from its .npz file, replacing the current entries"""
+        with np.load(self.path, allow_pickle=False) as data:
+            method, hash_size = (str(value) for value in data["settings"])
+            if method != self.method or int(hash_size) != self.hash_size:
+                raise ValueError(f"{self.path} holds {method} hashes of size {hash_size}, "
+                                 f"not {self.method} of size {self.hash_size}")
+            self.hashes = data["hashes"].copy()
+            self.count = len(self.hashes)
+            self.names = [str(name) for name in data["names"]]
+            self.positions = {name: position for position, name in enumerate(self.names)}
+            self.results = [json.loads(str(result)) for result in data["results"]]
+            # Entries saved without keys never match a keyed lookup
+            self.keys = [str(key) for key in data["keys"]] if "keys" in data.files else [""] * self.count
+            self.key_positions = {}
+            for position, key in enumerate(self.keys):
+                self.key_positions.setdefault(key, []).append(position)
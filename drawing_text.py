@@ -0,0 +1,173 @@
+"""
+Drawing Text Prioritization for Manufacturing Part Analyzer
+
+Ranks the text of a technical drawing so the prompt's text budget goes to the
+parts that decide manufacturing processes. Text blocks are located by their
+PyMuPDF coordinates: the title block (material, finish, part number) and the
+general notes (plating, heat treat, weld and insert callouts) come first,
+followed by other annotations. Dimension strings are collapsed into a single
+deduplicated line, and text repeated across blocks or sheets is sent only once.
+"""
+
+import re
+from typing import List, Sequence, Tuple
+
+
+# A text block as (x0, y0, x1, y1, text) with coordinates relative to the page size (0-1)
+TextBlock = Tuple[float, float, float, float, str]
+
+# Title blocks sit in the lower-right corner of the sheet
+TITLE_BLOCK_REGION = (0.55, 0.7)
+
+TITLE_BLOCK_KEYWORDS = re.compile(
+    r"\b(TITLE|DWG|DRAWING NO|PART NO|P/N|MATERIAL|MAT'L|FINISH|SCALE|REV|DRAWN|CHECKED|"
+    r"APPROVED|SHEET|WEIGHT|TOLERANCES?|UNLESS OTHERWISE)\b",
+    re.IGNORECASE
+)
+
+NOTES_HEADING = re.compile(r"\b(GENERAL\s+)?NOTES?\b\s*:?", re.IGNORECASE)
+
+NUMBERED_NOTE = re.compile(r"^\s*\d{1,2}\s*[.)]\s+[A-Za-z]")
+
+# Tokens that are only dimensions, tolerances, angles, radii, thread sizes or balloons
+DIMENSION_TOKEN = re.compile(
+    r"^[\(\[]?[Ø⌀R∅±+\-]?\d*[.,]?\d+(?:[\"'°]|MM|IN)?"
+    r"(?:\s*[xX×/±+\-]\s*[Ø⌀R]?\d*[.,]?\d+(?:[\"'°])?)*[\)\]]?$"
+)
+
+
+def is_dimension_text(text: str) -> bool:
+    """
+    Whether a block contains nothing but dimension-like tokens
+
+    Args:
+        text: Block text
+
+    Returns:
+        True for dimension noise such as "2.500 ±.005" or "Ø12.7 (3X)"
+    """
+    tokens = text.replace("(", " ").replace(")", " ").split()
+    tokens = [token for token in tokens if not re.fullmatch(r"\d+[xX×]|TYP\.?|REF\.?|THRU", token)]
+    return bool(tokens) and all(DIMENSION_TOKEN.match(token) for token in tokens)
+
+
+def classify_block(block: TextBlock) -> str:
+    """
+    Classify a text block by position and content
+
+    Args:
+        block: Text block with page-relative coordinates
+
+    Returns:
+        "title", "notes", "dimension" or "other"
+    """
+    x0, y0, x1, y1, text = block
+    center_x, center_y = (x0 + x1) / 2, (y0 + y1) / 2
+
+    if is_dimension_text(text):
+        return "dimension"
+    if NOTES_HEADING.match(text.lstrip()) or NUMBERED_NOTE.match(text):
+        return "notes"
+    if center_x >= TITLE_BLOCK_REGION[0] and center_y >= TITLE_BLOCK_REGION[1]:
+        return "title"
+    if TITLE_BLOCK_KEYWORDS.search(text):
+        return "title"
+    return "other"
+
+
+def prioritize_drawing_text(pages: Sequence[Sequence[TextBlock]], limit: int = 3000) -> str:
+    """
+    Build prompt text from a drawing's blocks, highest-signal regions first
+
+    Args:
+        pages: Text blocks for each page
+        limit: Maximum characters to return
+
+    Returns:
+        Prompt text with title block, notes, other text and dimensions sections
+    """
+    sections = {"title": [], "notes": [], "other": [], "dimension": []}
+    seen_lines = set()
+    seen_dimensions = set()
+
+    for blocks in pages:
+        # Read blocks top-to-bottom, left-to-right so numbered notes stay in order
+        for block in sorted(blocks, key=lambda b: (round(b[1], 2), b[0])):
+            category = classify_block(block)
+
+            if category == "dimension":
+                for token in block[4].split():
+                    if token not in seen_dimensions:
+                        seen_dimensions.add(token)
+                        sections["dimension"].append(token)
+                continue
+
+            lines = []
+            for line in block[4].splitlines():
+                line = " ".join(line.split())
+                key = line.upper()
+                if not line or key in seen_lines:
+                    continue
+                seen_lines.add(key)
+                lines.append(line)
+            if lines:
+                sections[category].append("\n".join(lines))
+
+    parts = []
+    if sections["title"]:
+        parts.append("[Title Block]\n" + "\n".join(sections["title"]))
+    if sections["notes"]:
+        parts.append("[Notes]\n" + "\n".join(sections["notes"]))
+    if sections["other"]:
+        parts.append("[Other Text]\n" + "\n".join(sections["other"]))
+    if sections["dimension"]:
+        parts.append("[Dimensions]\n" + " ".join(sections["dimension"]))
+
+    return "\n\n".join(parts)[:limit]
+
+
+def content_text(pages: Sequence[Sequence[TextBlock]]) -> str:
+    """
+    Text of a drawing outside the title block, for telling revisions apart
+
+    Two revisions that differ only in part number, revision letter or date
+    give the same string; a changed note, callout or dimension does not.
+
+    Args:
+        pages: Text blocks for each page
+
+    Returns:
+        Upper-cased, whitespace-normalized text of every non-title block in reading order
+    """
+    lines = []
+    for blocks in pages:
+        for block in sorted(blocks, key=lambda b: (round(b[1], 2), b[0])):
+            if classify_block(block) != "title":
+                lines.append(" ".join(block[4].upper().split()))
+    return "\n".join(lines)
+
+
+def page_blocks(page) -> List[TextBlock]:
+    """
+    Extract text blocks from a PyMuPDF page with page-relative coordinates
+
+    Args:
+        page: PyMuPDF page
+
+    Returns:
+        List of text blocks (image blocks are skipped)
+    """
+    width, height = page.rect.width, page.rect.height
+    origin = page.rect.tl
+    blocks = []
+    for x0, y0, x1, y1, text, _block_no, block_type in page.get_text("blocks"):
+        if block_type != 0 or not text.strip():
+            continue
+        blocks.append((
+            (x0 - origin.x) / width,
+            (y0 - origin.y) / height,
+            (x1 - origin.x) / width,
+            (y1 - origin.y) / height,
+            text
+        ))
+    return blocks
@@ -6,20 +6,308 @@ Uses Azure OpenAI (GPT-5) to analyze technical drawings and predict manufacturin
 import os
 import json
 import base64
+import hashlib
+import math
+import time
+import asyncio
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, Generator, Iterator, List, Optional, Tuple, Union
 import fitz  # PyMuPDF
-from openai import AzureOpenAI
+import numpy as np
+import pandas as pd
+from openai import AsyncAzureOpenAI, AzureOpenAI, RateLimitError
 from PIL import Image
 import io
 
+from batch_api import (BATCH_ENDPOINT, BATCH_MAX_FILE_BYTES, BATCH_MAX_REQUESTS, TERMINAL_STATUSES, batch_request_line,
+                       parse_batch_output)
+from drawing_hash import DrawingHashIndex
+from drawing_text import TextBlock, content_text, page_blocks, prioritize_drawing_text
+from rate_limiter import (CHARS_PER_TOKEN, IMAGE_BASE_TOKENS, IMAGE_TILE_TOKENS, RateLimiter,
+                          estimate_request_tokens, image_tile_count, model_image_size, retry_after_seconds)
+from result_cache import ResultCache
+from rule_classifier import classify_texts, rule_flags
+from retry_policy import RetryPolicy, attempt_record, retry_cost
+
+
+@dataclass
+class PageRecord:
+    """
+    Text and rendered pixmap for a single PDF page
+
+    The pixmap is set to None once it has been encoded so the raster can be
+    released while the text is kept for the prompt.
+    """
+    number: int
+    text: str
+    pixmap: Optional[fitz.Pixmap]
+    page_count: int = 1
+    blocks: Optional[List[TextBlock]] = None
+
+
+def payload_size(messages: List[Dict]) -> int:
+    """
+    Approximate request payload size from the message text and image data URLs
+    
+    Args:
+        messages: Chat messages
+        
+    Returns:
+        Size in bytes
+    """
+    size = 0
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            size += len(content)
+            continue
+        for part in content:
+            if part["type"] == "text":
+                size += len(part["text"])
+            elif part["type"] == "image_url":
+                size += len(part["image_url"]["url"])
+    return size
+
+
+def cascade_summary(results: List[Dict]) -> Dict:
+    """
+    Summarize escalation rate and per-stage latency of a cascade batch
+    
+    Args:
+        results: Analysis results carrying "cascade" records
+        
+    Returns:
+        Dictionary with screened and escalated counts, escalation rate, mean
+        seconds per stage and escalation reasons
+    """
+    records = [result["cascade"] for result in results if result and "cascade" in result]
+    escalated = [record for record in records if record["escalated"]]
+    vision = [record["vision_s"] for record in escalated if record.get("vision_s") is not None]
+    
+    reasons: Dict[str, int] = {}
+    for record in escalated:
+        reason = record["reason"].split(":")[0]
+        reasons[reason] = reasons.get(reason, 0) + 1
+    
+    return {
+        "screened": len(records),
+        "escalated": len(escalated),
+        "escalation_rate": len(escalated) / len(records) if records else 0.0,
+        "screen_s_mean": sum(record["screen_s"] for record in records) / len(records) if records else 0.0,
+        "vision_s_mean": sum(vision) / len(vision) if vision else 0.0,
+        "reasons": reasons
+    }
+
+
+def load_batch_results(output_file: str) -> Dict[str, Dict]:
+    """
+    Read a previous batch output (JSON array or JSONL) keyed by source file
+    
+    Later records for the same file supersede earlier ones, and a truncated
+    last line left behind by a crash is ignored.
+    
+    Args:
+        output_file: Batch output file path
+        
+    Returns:
+        Dictionary mapping source_file to its latest result
+    """
+    if not os.path.exists(output_file):
+        return {}
+    
+    records = []
+    with open(output_file, 'r') as f:
+        if output_file.endswith(".jsonl"):
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        else:
+            records = json.load(f)
+    
+    return {record.get("source_file"): record for record in records}
+
+
+class BatchCheckpoint:
+    """
+    Batch output that survives crashes
+    
+    With a .jsonl output file every result is appended and flushed as soon as
+    its drawing finishes. On resume, drawings that already have a successful
+    record are skipped; drawings whose last record is an error are retried.
+    """
+    
+    def __init__(self, output_file: str, resume: bool = False):
+        """
+        Open the batch output
+        
+        Args:
+            output_file: Output file path (.jsonl for per-drawing checkpoints)
+            resume: Skip drawings already completed successfully in output_file
+        """
+        self.output_file = output_file
+        self.jsonl = output_file.endswith(".jsonl")
+        self.completed = {}
+        if resume:
+            previous = load_batch_results(output_file)
+            self.completed = {name: record for name, record in previous.items() if "error" not in record}
+            print(f"Resuming: {len(self.completed)} drawings already completed")
+        
+        self.handle = None
+        if self.jsonl:
+            self.handle = open(output_file, 'a' if resume else 'w')
+            # Terminate a line truncated by a crash so the next record starts cleanly
+            if resume and self.handle.tell() > 0:
+                with open(output_file, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        self.handle.write("\n")
+    
+    def record(self, result: Dict):
+        """
+        Append one result and flush it to disk
+        
+        Args:
+            result: Analysis result dictionary
+        """
+        if self.handle is None:
+            return
+        self.handle.write(json.dumps(result) + "\n")
+        self.handle.flush()
+        os.fsync(self.handle.fileno())
+    
+    def close(self):
+        """Close the output file"""
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+
+class DrawingPack:
+    """
+    Collects small drawings for one packed request until a drawing or token limit is reached
+    """
+    
+    def __init__(self, max_drawings: int, token_budget: int):
+        """
+        Initialize an empty pack
+        
+        Args:
+            max_drawings: Maximum drawings per request
+            token_budget: Maximum estimated prompt tokens per request
+        """
+        self.max_drawings = max_drawings
+        self.token_budget = token_budget
+        self.entries: List = []
+        self.tokens = 0
+    
+    def fits(self, tokens: int) -> bool:
+        """Whether a drawing with the given token estimate can join the pack"""
+        if not self.entries:
+            return True
+        return len(self.entries) < self.max_drawings and self.tokens + tokens <= self.token_budget
+    
+    def add(self, entry, tokens: int):
+        """Add a drawing to the pack"""
+        self.entries.append(entry)
+        self.tokens += tokens
+    
+    def take(self) -> List:
+        """Return the packed drawings and start a new pack"""
+        entries = self.entries
+        self.entries = []
+        self.tokens = 0
+        return entries
+
 
 class ManufacturingPartAnalyzer:
     """
     Analyzes technical drawings (PDFs) to extract manufacturing characteristics
     """
     
-    def __init__(self, azure_endpoint: str, api_key: str, api_version: str = "2024-12-01-preview"):
+    client_class = AzureOpenAI
+    
+    # Bump whenever create_analysis_prompt changes so cached results are not reused
+    PROMPT_VERSION = "1"
+    
+    # Supported page color modes: full color, 8-bit gray, and black/white
+    COLOR_MODES = ("rgb", "gray", "bilevel")
+    
+    # Supported upload codecs; JPEG and WEBP honor image_quality
+    IMAGE_FORMATS = ("PNG", "JPEG", "WEBP")
+    
+    # Quality steps tried (from image_quality down) before shrinking a page to fit payload_budget
+    BUDGET_QUALITY_STEPS = (85, 70, 55, 40)
+    # Encoded size scales roughly with pixel area; aim this far under the limit when shrinking
+    BUDGET_SCALE_MARGIN = 0.9
+    
+    # Auto-crop: probe render resolution, gray level counted as ink, fraction of
+    # the sheet a line must span to be treated as a border frame, outer band of
+    # the sheet a frame line must lie in, and padding in points
+    CROP_PROBE_DPI = 36
+    CROP_INK_THRESHOLD = 200
+    CROP_FRAME_FRACTION = 0.8
+    CROP_FRAME_MARGIN = 0.1
+    CROP_PAD = 9
+    
+    # Characters of drawing text included in the prompt
+    PROMPT_TEXT_LIMIT = 3000
+    
+    # Rule pre-classification: off, override model flags with rule flags, or
+    # also skip the API for drawings the rules fully determine
+    RULE_MODES = ("off", "merge", "short_circuit")
+    
+    # Fields requested by create_analysis_prompt, in prompt order
+    RESULT_FIELDS = (
+        "complexity_level", "type", "part_name", "material", "part_notes",
+        "laser_cut", "saw_shear", "break_press", "fab", "weld", "painting", "heat_treat", "plating",
+        "cnc_machining_turning", "metal_rolling", "casting_forging", "tube_bending", "metal_spinning",
+        "turret_punch_stamping", "press", "inserts"
+    )
+    
+    # Free-text fields that are legitimately empty (a drawing without notes), so an
+    # empty first-pass value does not count as incomplete
+    OPTIONAL_TEXT_FIELDS = ("part_notes",)
+    
+    # Completion token limit with structured output: 21 short fields plus part_notes
+    # fit in roughly 300 tokens, so 600 leaves room for long notes
+    STRUCTURED_MAX_TOKENS = 600
+    
+    # Packed mode: drawings with at most this many pages may share a request
+    PACK_MAX_PAGES = 1
+    
+    PACK_NOTE = """
+
+**Multiple Drawings:** This request contains {count} separate drawings. Each one starts with a
+"Drawing: <file name>" label followed by its text and page images. Analyze each drawing on its own
+and return a JSON object with a "drawings" array holding one object per drawing, with all fields
+above plus "source_file" set to the drawing's file name."""
+    
+    # Cascade first pass: longest edge of the optional low-detail page thumbnails
+    THUMBNAIL_EDGE = 512
+    
+    SCREENING_NOTE = """
+
+**First Pass:** The full-resolution drawing images are not attached to this request. Also include
+"confidence": a number from 0 to 1 for how sure you are that every field above is correct from
+the information given. Use a low value if the drawing views would be needed to decide."""
+    
+    def __init__(self, azure_endpoint: str, api_key: str, api_version: str = "2024-12-01-preview",
+                 dpi: Union[int, str] = 300, max_tiles: Optional[int] = None,
+                 color_mode: str = "rgb", bilevel_threshold: int = 192,
+                 image_format: str = "PNG", image_quality: int = 85, payload_budget: Optional[int] = None,
+                 auto_crop: bool = False, prioritize_text: bool = False, rule_mode: str = "off",
+                 cascade_deployment: Optional[str] = None, cascade_threshold: float = 0.8,
+                 cascade_thumbnails: bool = False, structured_output: bool = True,
+                 pack_size: int = 1, pack_token_budget: int = 16000, cache: Optional[ResultCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None, retry_policy: Optional[RetryPolicy] = None,
+                 batch_client=None, duplicate_index: Optional[DrawingHashIndex] = None,
+                 duplicate_distance: int = 3):
         """
         Initialize the analyzer with Azure OpenAI credentials
         
@@ -27,12 +315,94 @@ class ManufacturingPartAnalyzer:
             azure_endpoint: Azure OpenAI endpoint URL
             api_key: Azure OpenAI API key
             api_version: API version to use (defaults to latest for GPT-5)
+            dpi: Resolution for rendering page images, or "auto" to size each page
+                 to the resolution the vision model actually uses
+            max_tiles: With dpi="auto", cap the 512px tiles billed per page
+            color_mode: "rgb", "gray" (rendered in PyMuPDF's gray colorspace), or
+                        "bilevel" (gray thresholded to pure black and white)
+            bilevel_threshold: Gray level below which a pixel becomes black in bilevel mode
+            image_format: Upload codec, "PNG", "JPEG" or "WEBP"
+            image_quality: Quality (1-100) for JPEG and WEBP
+            payload_budget: Maximum base64 image bytes per request; pages are
+                            re-encoded at lower quality, then lower resolution, to fit
+            auto_crop: Render only the content area of each page, dropping empty
+                       margins, border frames and the zone markers outside them
+            prioritize_text: Put title-block and notes text first in the prompt and
+                             deduplicate dimension strings and repeated lines
+            rule_mode: "off", "merge" (explicit drawing callouts found by rule_classifier
+                       override the model's flags) or "short_circuit" (as merge, and
+                       drawings whose flags are all decided by rules skip the API)
+            cascade_deployment: Cheaper deployment for a text-only first pass; the full
+                                vision request is sent only when that pass is uncertain
+                                or its JSON is incomplete (None disables the cascade)
+            cascade_threshold: Minimum first-pass confidence (0-1) accepted without escalation
+            cascade_thumbnails: Add low-detail page thumbnails to the first pass
+            structured_output: Request replies through a JSON-schema response_format
+                               built from RESULT_FIELDS, with a smaller max_tokens;
+                               disable for deployments without structured outputs
+            pack_size: In batch runs, the most drawings of up to PACK_MAX_PAGES pages sent in
+                       one request (1 disables packing); each request holds as many as
+                       fit in pack_token_budget
+            pack_token_budget: Estimated prompt tokens allowed per packed request
+            cache: Optional on-disk result cache; hits skip rendering and the API call
+            rate_limiter: Optional RPM/TPM limiter shared by every request from this analyzer
+            retry_policy: Retry and backoff policy for API calls (defaults to RetryPolicy())
+            batch_client: Client used by submit_batch and collect_batch (defaults to a
+                          synchronous AzureOpenAI client; pass a batch_api.LocalBatchClient
+                          to run the Batch API workflow offline)
+            duplicate_index: Optional perceptual-hash index of analyzed drawings; a drawing
+                             within duplicate_distance bits of an indexed one (a revision or
+                             dash-number variant differing only in the title block) reuses
+                             its result instead of calling the API
+            duplicate_distance: Largest Hamming distance treated as a near-duplicate
         """
-        self.client = AzureOpenAI(
+        # Retries are handled by retry_policy, so the client's built-in retries are disabled
+        self.client = self.client_class(
             azure_endpoint=azure_endpoint,
             api_key=api_key,
-            api_version=api_version
+            api_version=api_version,
+            max_retries=0
         )
+        if color_mode not in self.COLOR_MODES:
+            raise ValueError(f"color_mode must be one of {self.COLOR_MODES}, got {color_mode!r}")
+        image_format = image_format.upper().replace("JPG", "JPEG")
+        if image_format not in self.IMAGE_FORMATS:
+            raise ValueError(f"image_format must be one of {self.IMAGE_FORMATS}, got {image_format!r}")
+        if rule_mode not in self.RULE_MODES:
+            raise ValueError(f"rule_mode must be one of {self.RULE_MODES}, got {rule_mode!r}")
+        if pack_size > 1 and cascade_deployment:
+            raise ValueError("pack_size cannot be combined with cascade_deployment")
+        
+        self.dpi = dpi
+        self.max_tiles = max_tiles
+        self.color_mode = color_mode
+        self.bilevel_threshold = bilevel_threshold
+        self.image_format = image_format
+        self.image_quality = image_quality
+        self.payload_budget = payload_budget
+        self.auto_crop = auto_crop
+        self.prioritize_text = prioritize_text
+        self.rule_mode = rule_mode
+        self.cascade_deployment = cascade_deployment
+        self.cascade_threshold = cascade_threshold
+        self.cascade_thumbnails = cascade_thumbnails
+        self.structured_output = structured_output
+        self.pack_size = pack_size
+        self.pack_token_budget = pack_token_budget
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.duplicate_index = duplicate_index
+        self.duplicate_distance = duplicate_distance
+        # (hash, duplicate_key) of drawings sent to the API, added to the index once their result is known
+        self.drawing_hashes: Dict[str, Tuple[np.ndarray, str]] = {}
+        
+        # The Batch API is used synchronously, whichever client the analyzer uses for chat
+        if batch_client is None and self.client_class is AzureOpenAI:
+            batch_client = self.client
+        elif batch_client is None:
+            batch_client = AzureOpenAI(azure_endpoint=azure_endpoint, api_key=api_key, api_version=api_version)
+        self.batch_client = batch_client
         
         # Manufacturing characteristics to detect
         self.manufacturing_features = [
@@ -54,6 +424,213 @@ class ManufacturingPartAnalyzer:
             "Inserts"
         ]
     
+    def __getstate__(self) -> Dict:
+        """
+        Pickle everything except the API clients and rate limiter
+        
+        Rendering workers in a process pool only need the PDF helpers, and the
+        client's HTTP connection pool and the limiter's lock cannot be pickled.
+        """
+        state = self.__dict__.copy()
+        state["client"] = None
+        state["batch_client"] = None
+        state["rate_limiter"] = None
+        state["duplicate_index"] = None
+        return state
+    
+    def content_clip(self, page: fitz.Page) -> fitz.Rect:
+        """
+        Find the area of a page that holds the actual drawing content
+        
+        A low-resolution gray probe is rendered and its ink is projected onto
+        rows and columns with NumPy. A line spanning most of the sheet counts as
+        the border frame only if it lies in the outer margin band and has a
+        matching line in the opposite band; the frame and anything outside it
+        are ignored. Long part outlines or centerlines inside the sheet never
+        move the clip. Without a frame the plain ink bounding box is used.
+        Works for vector and scanned drawings alike.
+        
+        Args:
+            page: PyMuPDF page
+            
+        Returns:
+            Clip rectangle in page coordinates (the full page if no content is found)
+        """
+        scale = self.CROP_PROBE_DPI / 72
+        probe = page.get_pixmap(matrix=fitz.Matrix(scale, scale), colorspace=fitz.csGRAY)
+        samples = np.frombuffer(probe.samples_mv, dtype=np.uint8).reshape(probe.height, probe.stride)
+        ink = samples[:, :probe.width] < self.CROP_INK_THRESHOLD
+        height, width = ink.shape
+        
+        frame_rows = ink.sum(axis=1) > self.CROP_FRAME_FRACTION * width
+        frame_cols = ink.sum(axis=0) > self.CROP_FRAME_FRACTION * height
+        
+        # Search only inside frame lines found in both opposite margin bands
+        top, bottom = self.frame_bounds(np.flatnonzero(frame_rows), height)
+        left, right = self.frame_bounds(np.flatnonzero(frame_cols), width)
+        
+        inner = ink[top:bottom, left:right]
+        ink_rows = np.flatnonzero(inner.any(axis=1))
+        ink_cols = np.flatnonzero(inner.any(axis=0))
+        if not ink_rows.size or not ink_cols.size:
+            return page.rect
+        
+        origin = page.rect.tl
+        clip = fitz.Rect(
+            (left + ink_cols[0]) / scale - self.CROP_PAD,
+            (top + ink_rows[0]) / scale - self.CROP_PAD,
+            (left + ink_cols[-1] + 1) / scale + self.CROP_PAD,
+            (top + ink_rows[-1] + 1) / scale + self.CROP_PAD
+        ) + (origin.x, origin.y, origin.x, origin.y)
+        return clip & page.rect
+    
+    def frame_bounds(self, lines: np.ndarray, length: int) -> Tuple[int, int]:
+        """
+        Inner edges of a border frame along one axis
+        
+        Args:
+            lines: Positions of lines spanning most of the sheet
+            length: Probe size along this axis
+            
+        Returns:
+            Tuple of (first, end) positions inside the frame, or (0, length)
+            unless both margin bands hold a frame line
+        """
+        band = max(1, int(length * self.CROP_FRAME_MARGIN))
+        near = lines[lines < band]
+        far = lines[lines >= length - band]
+        if not near.size or not far.size:
+            return 0, length
+        return near.max() + 1, far.min()
+    
+    def page_dpi(self, page: fitz.Page, dpi: Union[int, str] = "auto",
+                 clip: Optional[fitz.Rect] = None) -> float:
+        """
+        Resolution to render a page at
+        
+        In "auto" mode the DPI is derived from the page's physical size so the
+        rendered image matches what the vision model keeps after downsampling:
+        the long edge is at most 2048px and the short edge at most 768px.
+        Rendering more pixels than that costs CPU, memory and upload bandwidth
+        for detail the model never sees.
+        
+        Args:
+            page: PyMuPDF page
+            dpi: Fixed resolution, or "auto"
+            clip: Area of the page that will be rendered (defaults to the whole page)
+            
+        Returns:
+            Render resolution in dots per inch
+        """
+        if dpi != "auto":
+            return dpi
+        
+        rect = clip if clip is not None else page.rect
+        long_in = max(rect.width, rect.height) / 72
+        short_in = min(rect.width, rect.height) / 72
+        
+        # Render a huge image in principle and see what the model would shrink it to
+        long_px, short_px = model_image_size(long_in * 10000, short_in * 10000)
+        if self.max_tiles:
+            while long_px > 1 and image_tile_count(long_px, short_px) > self.max_tiles:
+                long_px, short_px = long_px * 0.95, short_px * 0.95
+        
+        # Floor so rounding in the renderer never overshoots the model's size
+        return math.floor(long_px) / long_in
+    
+    def render_page(self, page: fitz.Page, matrix: fitz.Matrix,
+                    clip: Optional[fitz.Rect] = None) -> fitz.Pixmap:
+        """
+        Render a page in the configured color mode
+        
+        Engineering drawings are black-and-white line art, so gray rendering
+        cuts raster memory to a third and bilevel output compresses to much
+        smaller PNGs.
+        
+        Args:
+            page: PyMuPDF page
+            matrix: Render transformation matrix
+            clip: Area of the page to render (defaults to the whole page)
+            
+        Returns:
+            Rendered pixmap (RGB or single-channel gray)
+        """
+        if self.color_mode == "rgb":
+            return page.get_pixmap(matrix=matrix, clip=clip)
+        
+        pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, clip=clip)
+        if self.color_mode == "bilevel":
+            # Threshold in place on the pixmap's own buffer
+            samples = np.frombuffer(pix.samples_mv, dtype=np.uint8)
+            black = samples < self.bilevel_threshold
+            samples.fill(255)
+            samples[black] = 0
+        return pix
+    
+    def iter_pages(self, pdf_path: str, dpi: Union[int, str] = 300) -> Iterator[PageRecord]:
+        """
+        Lazily yield text and a rendered pixmap for each PDF page
+        
+        Each page is rendered only when requested, so a consumer that encodes
+        and releases every pixmap before asking for the next page holds at
+        most one raster in memory regardless of document length.
+        
+        Args:
+            pdf_path: Path to PDF file
+            dpi: Resolution for rendering, or "auto" to size each page for the model
+            
+        Yields:
+            PageRecords in page order
+        """
+        doc = fitz.open(pdf_path)
+        
+        try:
+            for page_num in range(len(doc)):
+                page = doc[page_num]
+                clip = self.content_clip(page) if self.auto_crop else None
+                page_dpi = self.page_dpi(page, dpi, clip)
+                mat = fitz.Matrix(page_dpi/72, page_dpi/72)
+                yield PageRecord(
+                    number=page_num + 1,
+                    text=page.get_text(),
+                    pixmap=self.render_page(page, mat, clip),
+                    page_count=len(doc),
+                    blocks=page_blocks(page) if self.prioritize_text else None
+                )
+        finally:
+            doc.close()
+    
+    def pages_to_text(self, pages: List[PageRecord]) -> str:
+        """
+        Join page text in the same layout as extract_text_from_pdf
+        
+        Args:
+            pages: PageRecords from iter_pages
+            
+        Returns:
+            Extracted text as string
+        """
+        text_content = []
+        
+        for page in pages:
+            text_content.append(f"--- Page {page.number} ---")
+            text_content.append(page.text)
+        
+        return "\n".join(text_content)
+    
+    def pixmap_to_image(self, pix: fitz.Pixmap) -> Image.Image:
+        """
+        Convert a rendered pixmap to a PIL Image
+        
+        Args:
+            pix: PyMuPDF pixmap
+            
+        Returns:
+            PIL Image
+        """
+        mode = "L" if pix.n == 1 else "RGB"
+        return Image.frombytes(mode, [pix.width, pix.height], pix.samples)
+    
     def pdf_to_images(self, pdf_path: str, dpi: int = 300) -> List[Image.Image]:
         """
         Convert PDF pages to images
@@ -75,8 +652,7 @@ class ManufacturingPartAnalyzer:
             pix = page.get_pixmap(matrix=mat)
             
             # Convert to PIL Image
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            images.append(img)
+            images.append(self.pixmap_to_image(pix))
         
         doc.close()
         return images
@@ -118,6 +694,78 @@ class ManufacturingPartAnalyzer:
         img_str = base64.b64encode(buffered.getvalue()).decode()
         return f"data:image/{format.lower()};base64,{img_str}"
     
+    def pixmap_to_base64(self, pix: fitz.Pixmap, format: str = "PNG", quality: int = 95) -> str:
+        """
+        Encode a rendered pixmap straight to a base64 data URL
+        
+        PyMuPDF compresses PNG and JPEG directly from the pixmap samples, so no
+        intermediate PIL image or BytesIO copy of the raster is created. WEBP
+        goes through a PIL image that shares the pixmap's buffer.
+        
+        Args:
+            pix: PyMuPDF pixmap
+            format: Image format ("PNG", "JPEG" or "WEBP")
+            quality: Quality (1-100) for JPEG and WEBP
+            
+        Returns:
+            Base64 encoded string
+        """
+        fmt = format.lower()
+        if fmt in ("jpg", "jpeg"):
+            img_bytes = pix.tobytes(output="jpg", jpg_quality=quality)
+            mime = "jpeg"
+        elif fmt == "webp":
+            mode = "L" if pix.n == 1 else "RGB"
+            image = Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, "raw", mode, pix.stride, 1)
+            buffered = io.BytesIO()
+            image.save(buffered, format="WEBP", quality=quality)
+            img_bytes = buffered.getvalue()
+            mime = "webp"
+        else:
+            img_bytes = pix.tobytes(output=fmt)
+            mime = fmt
+        
+        img_str = base64.b64encode(img_bytes).decode()
+        return f"data:image/{mime};base64,{img_str}"
+    
+    def encode_page(self, pix: fitz.Pixmap, max_bytes: Optional[int] = None) -> str:
+        """
+        Encode a page in the configured format, fitting it under a byte limit
+        
+        Quality is lowered first (lossy formats only). If the lowest quality is
+        still too large, the resolution is scaled by the square root of the
+        size ratio (encoded size grows with pixel area) and the page is encoded
+        again at that quality, repeating only while it is still over. If the
+        page cannot shrink any further the smallest attempt is used anyway.
+        
+        Args:
+            pix: PyMuPDF pixmap
+            max_bytes: Maximum data URL length, or None for no limit
+            
+        Returns:
+            Base64 data URL
+        """
+        lossy = self.image_format != "PNG"
+        qualities = [self.image_quality]
+        if lossy and max_bytes is not None:
+            qualities += [q for q in self.BUDGET_QUALITY_STEPS if q < self.image_quality]
+        
+        for quality in qualities:
+            encoded = self.pixmap_to_base64(pix, format=self.image_format, quality=quality)
+            if max_bytes is None or len(encoded) <= max_bytes:
+                return encoded
+        
+        while True:
+            scale = math.sqrt(max_bytes / len(encoded)) * self.BUDGET_SCALE_MARGIN
+            width = int(pix.width * scale)
+            height = int(pix.height * scale)
+            if min(width, height) < 64:
+                return encoded
+            pix = fitz.Pixmap(pix, width, height, None)
+            encoded = self.pixmap_to_base64(pix, format=self.image_format, quality=qualities[-1])
+            if len(encoded) <= max_bytes:
+                return encoded
+    
     def create_analysis_prompt(self, extracted_text: str) -> str:
         """
         Create detailed prompt for manufacturing analysis
@@ -180,120 +828,1874 @@ Return ONLY a valid JSON object with all fields. Do not include any other text."
 
         return prompt
     
-    def analyze_part(self, pdf_path: str, deployment_name: str = "gpt-5-chat") -> Dict:
+    def render_settings(self) -> Dict:
         """
-        Analyze a technical drawing PDF and predict manufacturing characteristics
+        Settings that change the page images and text sent to the model
+        
+        Returns:
+            Dictionary of render settings (part of the result cache key)
+        """
+        return {
+            "dpi": self.dpi,
+            "max_tiles": self.max_tiles,
+            "color_mode": self.color_mode,
+            "bilevel_threshold": self.bilevel_threshold if self.color_mode == "bilevel" else None,
+            "format": self.image_format,
+            "quality": self.image_quality if self.image_format != "PNG" else None,
+            "payload_budget": self.payload_budget,
+            "auto_crop": self.auto_crop,
+            "prioritize_text": self.prioritize_text,
+            "cascade": [self.cascade_deployment, self.cascade_threshold, self.cascade_thumbnails]
+                       if self.cascade_deployment else None,
+            "structured_output": self.structured_output,
+            "pack_size": self.pack_size if self.pack_size > 1 else None
+        }
+    
+    def cache_key(self, pdf_path: str, deployment_name: str) -> Optional[str]:
+        """
+        Result cache key for a drawing, or None when caching is disabled
         
         Args:
             pdf_path: Path to PDF file
-            deployment_name: Azure OpenAI deployment name (defaults to gpt-5-chat)
+            deployment_name: Azure OpenAI deployment name
             
         Returns:
-            Dictionary with analysis results
+            Cache key string or None
         """
-        print(f"Analyzing: {pdf_path}")
+        if self.cache is None:
+            return None
+        return self.cache.make_key(pdf_path, deployment_name, self.PROMPT_VERSION, self.render_settings())
+    
+    def cached_result(self, cache_key: Optional[str], pdf_path: str) -> Optional[Dict]:
+        """
+        Look up a cached result
         
-        # Extract text
-        print("Extracting text from PDF...")
-        extracted_text = self.extract_text_from_pdf(pdf_path)
+        Args:
+            cache_key: Key from cache_key
+            pdf_path: Path to PDF file
+            
+        Returns:
+            Cached result dictionary, or None on a miss
+        """
+        if cache_key is None:
+            return None
+        result = self.cache.get(cache_key)
+        if result is not None:
+            print("Using cached result")
+            # Identical drawings can be filed under different names
+            result["source_file"] = os.path.basename(pdf_path)
+        return result
+    
+    def store_result(self, cache_key: Optional[str], result: Dict):
+        """
+        Store a successful result in the cache; error records are never cached
         
-        # Convert PDF to images
-        print("Converting PDF to images...")
-        images = self.pdf_to_images(pdf_path)
+        Args:
+            cache_key: Key from cache_key
+            result: Analysis result dictionary
+        """
+        if "error" in result:
+            return
+        # Timings describe this run only
+        stored = {key: value for key, value in result.items() if key not in ("attempts", "elapsed_s")}
+        if cache_key is not None:
+            self.cache.put(cache_key, stored)
+        indexed = self.drawing_hashes.pop(result.get("source_file"), None)
+        if indexed is not None:
+            drawing_hash, key = indexed
+            self.duplicate_index.add(drawing_hash, result["source_file"], stored, key)
+    
+    def duplicate_key(self, pdf_path: str, deployment_name: str, rules: Optional[Dict]) -> str:
+        """
+        Digest of what a near-duplicate must share besides its image hash
         
-        # Create prompt
-        prompt = self.create_analysis_prompt(extracted_text)
+        The hash is taken from a 256-pixel render that cannot read note text, so
+        a drawing only reuses a result when its text outside the title block and
+        its rule flags and material are identical as well. Like the result cache
+        key, it also covers the deployment, PROMPT_VERSION and render settings,
+        so results from an older prompt or model are never reused.
         
-        # Prepare messages with images
-        messages = [
-            {
-                "role": "system",
-                "content": "You are an expert manufacturing engineer who analyzes technical drawings."
-            },
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt}
-                ]
-            }
-        ]
+        Args:
+            pdf_path: Path to PDF file
+            deployment_name: Azure OpenAI deployment name
+            rules: rule_check output (the rules are run here when it is None)
+            
+        Returns:
+            Hex digest used as the drawing's duplicate index key
+        """
+        if rules is None:
+            row = classify_texts([self.extract_text_from_pdf(pdf_path)]).iloc[0]
+            rules = {"flags": rule_flags(row), "material": None if pd.isna(row["material"]) else row["material"]}
+        with fitz.open(pdf_path) as doc:
+            content = content_text([page_blocks(page) for page in doc])
+        key = {"content": content, "flags": rules["flags"], "material": rules["material"],
+               "deployment": deployment_name, "prompt_version": self.PROMPT_VERSION,
+               "render": self.render_settings()}
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+    
+    def duplicate_result(self, pdf_path: str, deployment_name: str, rules: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Reuse the result of the closest indexed drawing if it is a near-duplicate
         
-        # Add all page images
-        for idx, img in enumerate(images):
-            print(f"Processing page {idx + 1}...")
-            base64_image = self.image_to_base64(img)
-            messages[1]["content"].append({
-                "type": "image_url",
-                "image_url": {"url": base64_image}
-            })
+        The drawing's hash and key are recorded in drawing_hashes and looked up
+        with indexed_duplicate. A drawing with no near-duplicate keeps them there
+        until store_result adds it to the index along with its result.
         
-        # Call Azure OpenAI
-        print("Calling Azure OpenAI for analysis...")
-        try:
-            response = self.client.chat.completions.create(
-                model=deployment_name,
-                messages=messages,
-                max_tokens=2000,
-                temperature=0.1  # Low temperature for consistent analysis
-            )
-            
-            result_text = response.choices[0].message.content
-            
-            # Extract JSON from response
-            # Sometimes the model wraps JSON in markdown code blocks
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0]
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1].split("```")[0]
-            
-            result = json.loads(result_text.strip())
-            
-            # Add metadata
-            result["source_file"] = os.path.basename(pdf_path)
-            result["extracted_text_preview"] = extracted_text[:500]
-            
-            return result
+        Args:
+            pdf_path: Path to PDF file
+            deployment_name: Azure OpenAI deployment name
+            rules: rule_check output for the drawing
             
+        Returns:
+            Copy of the indexed result with "duplicate_of" naming the drawing it came
+            from, or None when no index is set or nothing is close enough
+        """
+        if self.duplicate_index is None:
+            return None
+        try:
+            drawing_hash = self.duplicate_index.hash_drawing(pdf_path)
+            key = self.duplicate_key(pdf_path, deployment_name, rules)
         except Exception as e:
-            print(f"Error during analysis: {e}")
-            return {
-                "error": str(e),
-                "source_file": os.path.basename(pdf_path)
-            }
+            print(f"Duplicate check skipped for {pdf_path}: {e}")
+            return None
+        
+        source_file = os.path.basename(pdf_path)
+        self.drawing_hashes[source_file] = (drawing_hash, key)
+        return self.indexed_duplicate(source_file)
     
-    def analyze_batch(self, pdf_directory: str, output_file: str = "analysis_results.json") -> List[Dict]:
+    def indexed_duplicate(self, source_file: str) -> Optional[Dict]:
         """
-        Analyze multiple PDF files in a directory
+        Look up a drawing whose hash and key are recorded in drawing_hashes
+        
+        Only indexed drawings with the same duplicate_key are considered, and
+        nothing is reused while the result cache is refreshing.
         
         Args:
-            pdf_directory: Directory containing PDF files
-            output_file: Output JSON file path
+            source_file: Drawing file name
             
         Returns:
-            List of analysis results
+            Copy of the indexed result with "duplicate_of" naming the drawing it came
+            from, or None when nothing is close enough
         """
-        pdf_files = list(Path(pdf_directory).glob("*.pdf"))
-        results = []
-        
-        print(f"Found {len(pdf_files)} PDF files to analyze")
+        drawing_hash, key = self.drawing_hashes[source_file]
+        # A refresh re-analyzes every drawing, and the fresh results replace the indexed ones
+        if self.cache is not None and self.cache.refresh:
+            return None
+        match = self.duplicate_index.nearest(drawing_hash, self.duplicate_distance, key)
+        if match is None or match[2] is None or match[0] == source_file:
+            return None
         
-        for pdf_file in pdf_files:
-            result = self.analyze_part(str(pdf_file))
-            results.append(result)
-            print(f"Completed: {pdf_file.name}\n")
+        del self.drawing_hashes[source_file]
+        original, distance, stored = match
+        print(f"{source_file}: near-duplicate of {original} ({distance} bits), reusing its result")
+        result = {field: value for field, value in stored.items()
+                  if field not in ("duplicate_of", "rule_flags", "pack", "cascade")}
+        result["source_file"] = source_file
+        result["duplicate_of"] = {"source_file": original, "distance": distance}
+        return result
+    
+    def save_duplicate_index(self):
+        """Write the duplicate index to its file, if it has one"""
+        if self.duplicate_index is not None and self.duplicate_index.path is not None:
+            self.duplicate_index.save()
+            print(f"Duplicate index saved to: {self.duplicate_index.path} ({len(self.duplicate_index)} drawings)")
+    
+    def rule_check(self, pdf_path: str) -> Optional[Dict]:
+        """
+        Run the rule-based pre-classifier over a drawing's text
         
-        # Save results
-        with open(output_file, 'w') as f:
-            json.dump(results, f, indent=2)
+        Only text is extracted; no pages are rendered.
         
-        print(f"Results saved to: {output_file}")
-        return results
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            Dictionary with "flags", "material", "determined" and "text_preview", or
+            None when rule_mode is "off" or the PDF cannot be read
+        """
+        return self.rule_checks([pdf_path])[0]
+    
+    def rule_checks(self, pdf_paths: List[str]) -> List[Optional[Dict]]:
+        """
+        Run the rule-based pre-classifier over many drawings at once
+        
+        Text is extracted from every drawing first and the whole batch is
+        classified with a single classify_texts call.
+        
+        Args:
+            pdf_paths: Paths to PDF files
+            
+        Returns:
+            rule_check output for each path, in the same order
+        """
+        if self.rule_mode == "off":
+            return [None] * len(pdf_paths)
+        texts = {}
+        for position, pdf_path in enumerate(pdf_paths):
+            try:
+                texts[position] = self.extract_text_from_pdf(pdf_path)
+            except Exception as e:
+                print(f"Rule check skipped for {pdf_path}: {e}")
+        
+        checks: List[Optional[Dict]] = [None] * len(pdf_paths)
+        table = classify_texts(list(texts.values()), index=list(texts))
+        for position, row in table.iterrows():
+            checks[position] = {
+                "flags": rule_flags(row),
+                "material": None if pd.isna(row["material"]) else row["material"],
+                "determined": bool(row["determined"]),
+                "text_preview": texts[position][:500]
+            }
+        return checks
+    
+    def batch_rule_checks(self, pdf_files: List[Path],
+                          completed: Optional[Dict[str, Dict]] = None) -> List[Optional[Dict]]:
+        """
+        Run rule_checks over the drawings of a batch that still need analysis
+        
+        Args:
+            pdf_files: PDF files in the batch
+            completed: Results already completed, by file name (those files are skipped)
+            
+        Returns:
+            rule_check output for each file, None for skipped files
+        """
+        completed = completed or {}
+        pending = [idx for idx, pdf_file in enumerate(pdf_files) if pdf_file.name not in completed]
+        checks: List[Optional[Dict]] = [None] * len(pdf_files)
+        for idx, check in zip(pending, self.rule_checks([str(pdf_files[idx]) for idx in pending])):
+            checks[idx] = check
+        return checks
+    
+    def rules_result(self, rules: Dict, pdf_path: str) -> Optional[Dict]:
+        """
+        Result built from rules alone when short-circuiting is enabled
+        
+        Args:
+            rules: Output of rule_check
+            pdf_path: Path to PDF file
+            
+        Returns:
+            Result dictionary for a fully determined drawing, otherwise None
+        """
+        if rules is None or self.rule_mode != "short_circuit" or not rules["determined"]:
+            return None
+        print(f"{os.path.basename(pdf_path)}: all process flags determined by rules, skipping API call")
+        result = dict(rules["flags"])
+        if rules["material"]:
+            result["material"] = rules["material"]
+        result["classified_by"] = "rules"
+        result["source_file"] = os.path.basename(pdf_path)
+        result["extracted_text_preview"] = rules["text_preview"]
+        return result
+    
+    def apply_rules(self, result: Dict, rules: Optional[Dict]) -> Dict:
+        """
+        Override model flags with high-confidence rule flags
+        
+        Args:
+            result: Analysis result from the model (or the cache)
+            rules: Output of rule_check
+            
+        Returns:
+            The same result, with "rule_flags" listing the flags the rules decided
+        """
+        if rules is None or "error" in result:
+            return result
+        result.update(rules["flags"])
+        result["rule_flags"] = rules["flags"]
+        return result
+    
+    def prepare_messages(self, pdf_path: str) -> Tuple[List[Dict], str]:
+        """
+        Build the chat messages (prompt plus page images) for a drawing
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            Tuple of (messages, extracted text)
+        """
+        # Prepare messages; the prompt text is filled in once all pages are read
+        messages = [
+            {
+                "role": "system",
+                "content": "You are an expert manufacturing engineer who analyzes technical drawings."
+            },
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": ""}
+                ]
+            }
+        ]
+        
+        # Stream pages in a single pass: each page is rendered, encoded into
+        # the payload and released before the next one is rendered
+        print("Loading PDF pages...")
+        pages = []
+        for page in self.iter_pages(pdf_path, dpi=self.dpi):
+            print(f"Processing page {page.number}...")
+            # Split the request's payload budget evenly across pages
+            page_budget = None
+            if self.payload_budget is not None:
+                page_budget = self.payload_budget // page.page_count
+            base64_image = self.encode_page(page.pixmap, page_budget)
+            page.pixmap = None
+            pages.append(page)
+            messages[1]["content"].append({
+                "type": "image_url",
+                "image_url": {"url": base64_image}
+            })
+        
+        # Create prompt
+        extracted_text = self.prompt_text(pages)
+        messages[1]["content"][0]["text"] = self.create_analysis_prompt(extracted_text)
+        
+        return messages, extracted_text
+    
+    def prompt_text(self, pages: List[PageRecord]) -> str:
+        """
+        Drawing text for the prompt, prioritized when prioritize_text is set
+        
+        Args:
+            pages: PageRecords of the drawing
+            
+        Returns:
+            Extracted text as string
+        """
+        if self.prioritize_text:
+            return prioritize_drawing_text([page.blocks for page in pages], limit=self.PROMPT_TEXT_LIMIT)
+        return self.pages_to_text(pages)
+    
+    def screening_messages(self, pdf_path: str) -> Tuple[List[Dict], str]:
+        """
+        Build the cascade's first-pass messages: the prompt text without full page images
+        
+        Pages are rendered only when cascade_thumbnails is set, and then only as
+        low-detail thumbnails billed at the base image rate.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            Tuple of (messages, extracted text)
+        """
+        pages = []
+        thumbnails = []
+        with fitz.open(pdf_path) as doc:
+            for page_num in range(len(doc)):
+                page = doc[page_num]
+                pages.append(PageRecord(
+                    number=page_num + 1,
+                    text=page.get_text(),
+                    pixmap=None,
+                    page_count=len(doc),
+                    blocks=page_blocks(page) if self.prioritize_text else None
+                ))
+                if self.cascade_thumbnails:
+                    zoom = self.THUMBNAIL_EDGE / max(page.rect.width, page.rect.height)
+                    pix = self.render_page(page, fitz.Matrix(zoom, zoom))
+                    thumbnails.append({
+                        "type": "image_url",
+                        "image_url": {"url": self.encode_page(pix), "detail": "low"}
+                    })
+        
+        extracted_text = self.prompt_text(pages)
+        prompt = self.create_analysis_prompt(extracted_text) + self.SCREENING_NOTE
+        messages = [
+            {
+                "role": "system",
+                "content": "You are an expert manufacturing engineer who analyzes technical drawings."
+            },
+            {
+                "role": "user",
+                "content": [{"type": "text", "text": prompt}] + thumbnails
+            }
+        ]
+        return messages, extracted_text
+    
+    def screening_outcome(self, result_text: str, pdf_path: str,
+                          extracted_text: str) -> Tuple[Optional[Dict], Optional[str], Optional[float]]:
+        """
+        Decide whether a first-pass reply can be accepted
+        
+        Args:
+            result_text: Message content returned by the cascade deployment
+            pdf_path: Path to the analyzed PDF
+            extracted_text: Text sent in the first pass
+            
+        Returns:
+            Tuple of (result or None to escalate, escalation reason, reported confidence)
+        """
+        try:
+            result = self.parse_response(result_text, pdf_path, extracted_text)
+        except ValueError:
+            return None, "invalid_json", None
+        
+        confidence = result.pop("confidence", None)
+        try:
+            confidence = float(confidence)
+        except (TypeError, ValueError):
+            return None, "no_confidence", None
+        
+        missing = [field for field in self.RESULT_FIELDS if result.get(field) is None
+                   or (result[field] == "" and field not in self.OPTIONAL_TEXT_FIELDS)]
+        if missing:
+            return None, f"incomplete: {', '.join(missing)}", confidence
+        if confidence < self.cascade_threshold:
+            return None, f"low_confidence: {confidence:.2f}", confidence
+        return result, None, confidence
+    
+    def finish_cascade(self, result: Dict, cascade: Dict, screen_attempts: List[Dict]) -> Dict:
+        """
+        Attach the cascade record and first-pass attempts to a result
+        
+        Args:
+            result: Final analysis result
+            cascade: Record from screen_part, with vision_s filled in after escalation
+            screen_attempts: Attempt records of the first pass
+            
+        Returns:
+            The same result
+        """
+        if cascade["escalated"]:
+            result["attempts"] = screen_attempts + result.get("attempts", [])
+        result["cascade"] = cascade
+        return result
+    
+    def response_format(self, screening: bool = False, packed: bool = False) -> Dict:
+        """
+        JSON-schema response format matching the fields of create_analysis_prompt
+        
+        Args:
+            screening: Add the "confidence" field requested in a cascade first pass
+            packed: Wrap per-drawing objects, keyed by "source_file", in a "drawings" array
+            
+        Returns:
+            response_format parameter for chat.completions.create
+        """
+        properties = {
+            "complexity_level": {"type": "string", "enum": ["Simple", "Moderate", "Complex", "Very Complex"]},
+            "type": {"type": "string"},
+            "part_name": {"type": "string"},
+            "material": {"type": "string"},
+            "part_notes": {"type": "string"}
+        }
+        for field in self.RESULT_FIELDS:
+            if field not in properties:
+                properties[field] = {"type": "integer", "enum": [0, 1]}
+        if screening:
+            properties["confidence"] = {"type": "number"}
+        if packed:
+            properties = {"source_file": {"type": "string"}, **properties}
+        
+        schema = {
+            "type": "object",
+            "properties": properties,
+            "required": list(properties),
+            "additionalProperties": False
+        }
+        if packed:
+            schema = {
+                "type": "object",
+                "properties": {"drawings": {"type": "array", "items": schema}},
+                "required": ["drawings"],
+                "additionalProperties": False
+            }
+        
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "manufacturing_analysis_batch" if packed else "manufacturing_analysis",
+                "strict": True,
+                "schema": schema
+            }
+        }
+    
+    def completion_params(self, messages: List[Dict], deployment_name: str, screening: bool = False) -> Dict:
+        """
+        Keyword arguments for chat.completions.create
+        
+        Args:
+            messages: Chat messages from prepare_messages
+            deployment_name: Azure OpenAI deployment name
+            screening: Request a cascade first-pass reply (adds "confidence" to the schema)
+            
+        Returns:
+            Dictionary of request parameters
+        """
+        params = {
+            "model": deployment_name,
+            "messages": messages,
+            "max_tokens": 2000,
+            "temperature": 0.1  # Low temperature for consistent analysis
+        }
+        if self.structured_output:
+            params["response_format"] = self.response_format(screening)
+            params["max_tokens"] = self.STRUCTURED_MAX_TOKENS
+        return params
+    
+    def reask_params(self, result_text: str, deployment_name: str) -> Dict:
+        """
+        Parameters for a cheap text-only request that repairs an invalid JSON reply
+        
+        The drawing images are not resent; the model only has to reformat its
+        previous answer.
+        
+        Args:
+            result_text: Reply that could not be parsed as JSON
+            deployment_name: Azure OpenAI deployment name
+            
+        Returns:
+            Dictionary of request parameters
+        """
+        params = {
+            "model": deployment_name,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You convert manufacturing analysis answers into strict JSON."
+                },
+                {
+                    "role": "user",
+                    "content": "Rewrite the following answer as ONLY a valid JSON object with the same "
+                               "fields and values. Do not include any other text.\n\n" + result_text
+                }
+            ],
+            "max_tokens": 2000,
+            "temperature": 0
+        }
+        if self.structured_output:
+            params["response_format"] = self.response_format()
+            params["max_tokens"] = self.STRUCTURED_MAX_TOKENS
+        return params
+    
+    def extract_json(self, result_text: str):
+        """
+        Decode the JSON in a model reply
+        
+        Args:
+            result_text: Message content returned by the model
+            
+        Returns:
+            Decoded JSON value
+        """
+        # Extract JSON from response
+        # Sometimes the model wraps JSON in markdown code blocks
+        if "```json" in result_text:
+            result_text = result_text.split("```json")[1].split("```")[0]
+        elif "```" in result_text:
+            result_text = result_text.split("```")[1].split("```")[0]
+        
+        return json.loads(result_text.strip())
+    
+    def parse_response(self, result_text: str, pdf_path: str, extracted_text: str) -> Dict:
+        """
+        Parse the model's reply into a result dictionary
+        
+        Args:
+            result_text: Message content returned by the model
+            pdf_path: Path to the analyzed PDF
+            extracted_text: Text extracted from the PDF
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        result = self.extract_json(result_text)
+        
+        # Add metadata
+        result["source_file"] = os.path.basename(pdf_path)
+        result["extracted_text_preview"] = extracted_text[:500]
+        
+        return result
+    
+    def pack_cost(self, pdf_path: str) -> Optional[int]:
+        """
+        Estimated prompt tokens a drawing adds to a packed request
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            Token estimate, or None when the drawing has too many pages to pack
+        """
+        with fitz.open(pdf_path) as doc:
+            if len(doc) > self.PACK_MAX_PAGES:
+                return None
+            tokens = 0
+            text_chars = 0
+            for page in doc:
+                dpi = self.page_dpi(page, self.dpi)
+                tiles = image_tile_count(page.rect.width * dpi / 72, page.rect.height * dpi / 72)
+                tokens += IMAGE_BASE_TOKENS + IMAGE_TILE_TOKENS * tiles
+                text_chars += len(page.get_text())
+        return tokens + min(text_chars, self.PROMPT_TEXT_LIMIT) // CHARS_PER_TOKEN
+    
+    def prepare_packed_messages(self, pdf_paths: List[str]) -> Tuple[List[Dict], List[str]]:
+        """
+        Build one request holding several drawings, each labeled with its file name
+        
+        The analysis instructions are sent once; every drawing adds only its
+        text and page images.
+        
+        Args:
+            pdf_paths: Paths to the PDF files
+            
+        Returns:
+            Tuple of (messages, extracted text of each drawing)
+        """
+        prompt = self.create_analysis_prompt("(Given with each drawing below.)")
+        content = [{"type": "text", "text": prompt + self.PACK_NOTE.format(count=len(pdf_paths))}]
+        texts = []
+        
+        for pdf_path in pdf_paths:
+            messages, extracted_text = self.prepare_messages(pdf_path)
+            texts.append(extracted_text)
+            content.append({
+                "type": "text",
+                "text": f"**Drawing: {os.path.basename(pdf_path)}**\n{extracted_text[:self.PROMPT_TEXT_LIMIT]}"
+            })
+            content.extend(messages[1]["content"][1:])
+        
+        return [messages[0], {"role": "user", "content": content}], texts
+    
+    def packed_params(self, messages: List[Dict], deployment_name: str, count: int) -> Dict:
+        """
+        Request parameters for a packed request
+        
+        Args:
+            messages: Chat messages from prepare_packed_messages
+            deployment_name: Azure OpenAI deployment name
+            count: Number of drawings in the request
+            
+        Returns:
+            Dictionary of request parameters
+        """
+        params = self.completion_params(messages, deployment_name)
+        params["max_tokens"] *= count
+        if self.structured_output:
+            params["response_format"] = self.response_format(packed=True)
+        return params
+    
+    def parse_packed_response(self, result_text: str, pdf_paths: List[str], texts: List[str]) -> List[Dict]:
+        """
+        Split a packed reply into one result per drawing
+        
+        Args:
+            result_text: Message content returned by the model
+            pdf_paths: Paths of the packed PDFs, in request order
+            texts: Extracted text of each drawing
+            
+        Returns:
+            Result dictionaries in the same order as pdf_paths
+            
+        Raises:
+            ValueError: If the reply is not JSON or its drawings do not match the request
+        """
+        data = self.extract_json(result_text)
+        drawings = data.get("drawings") if isinstance(data, dict) else data
+        if not isinstance(drawings, list) or not all(isinstance(drawing, dict) for drawing in drawings):
+            raise ValueError("Packed reply has no drawings array")
+        
+        names = [os.path.basename(pdf_path) for pdf_path in pdf_paths]
+        by_name = {os.path.basename(str(drawing.get("source_file", ""))): drawing for drawing in drawings}
+        if len(drawings) != len(names) or set(by_name) != set(names):
+            raise ValueError(f"Packed reply covers {sorted(by_name)}, expected {names}")
+        
+        results = []
+        for name, text in zip(names, texts):
+            result = by_name[name]
+            result["source_file"] = name
+            result["extracted_text_preview"] = text[:500]
+            results.append(result)
+        return results
+    
+    def analyze_pack(self, entries: List[Tuple], deployment_name: str) -> List[Dict]:
+        """
+        Analyze several drawings that precheck did not resolve in one request
+        
+        Falls back to one request per drawing when the packed request fails or
+        its reply does not match the drawings.
+        
+        Args:
+            entries: (index, pdf_path, rules, cache_key) for each drawing
+            deployment_name: Azure OpenAI deployment name
+            
+        Returns:
+            Result dictionaries in the same order as entries
+        """
+        started = time.perf_counter()
+        pdf_paths = [pdf_path for _, pdf_path, _, _ in entries]
+        
+        if len(entries) > 1:
+            print(f"Analyzing {len(entries)} drawings in one request: "
+                  + ", ".join(os.path.basename(pdf_path) for pdf_path in pdf_paths))
+            messages, texts = self.prepare_packed_messages(pdf_paths)
+            results = self.request_packed_analysis(messages, texts, pdf_paths, deployment_name)
+            if results is not None:
+                return self.finish_pack(results, entries, started)
+            print("Falling back to one request per drawing")
+        
+        return [self.analyze_checked(pdf_path, deployment_name, rules, cache_key, time.perf_counter())
+                for _, pdf_path, rules, cache_key in entries]
+    
+    def finish_pack(self, results: List[Dict], entries: List[Tuple], started: float) -> List[Dict]:
+        """
+        Time, cache and apply rules to the results of a packed request
+        
+        Args:
+            results: Results from request_packed_analysis
+            entries: (index, pdf_path, rules, cache_key) for each drawing
+            started: time.perf_counter() value when work on the pack started
+            
+        Returns:
+            The same results
+        """
+        for result, (_, _, rules, cache_key) in zip(results, entries):
+            result["elapsed_s"] = round(time.perf_counter() - started, 3)
+            self.store_result(cache_key, result)
+            self.apply_rules(result, rules)
+        return results
+    
+    def request_packed_analysis(self, messages: List[Dict], texts: List[str], pdf_paths: List[str],
+                                deployment_name: str) -> Optional[List[Dict]]:
+        """
+        Send a packed request and split the reply per drawing
+        
+        Args:
+            messages: Chat messages from prepare_packed_messages
+            texts: Extracted text of each drawing
+            pdf_paths: Paths of the packed PDFs
+            deployment_name: Azure OpenAI deployment name
+            
+        Returns:
+            Result dictionaries in the same order as pdf_paths, or None if the
+            request failed or the reply did not match the drawings (an awaitable
+            of them in the async analyzer)
+        """
+        return self.run_steps(self.packed_steps(messages, texts, pdf_paths, deployment_name))
+    
+    def packed_steps(self, messages: List[Dict], texts: List[str], pdf_paths: List[str],
+                     deployment_name: str) -> Generator:
+        """Request steps of request_packed_analysis, driven by run_steps"""
+        print("Calling Azure OpenAI for packed analysis...")
+        attempts = []
+        payload_bytes = payload_size(messages)
+        try:
+            response = yield self.packed_params(messages, deployment_name, len(pdf_paths)), attempts, "packed"
+            results = self.parse_packed_response(response.choices[0].message.content, pdf_paths, texts)
+        except Exception as e:
+            print(f"Packed analysis failed: {e}")
+            return None
+        return self.split_pack_metadata(results, attempts, payload_bytes)
+    
+    def split_pack_metadata(self, results: List[Dict], attempts: List[Dict], payload_bytes: int) -> List[Dict]:
+        """
+        Attach the shared request's attempts and payload size to packed results
+        
+        Attempts are recorded on the first result only, so retry_cost counts
+        the shared request once.
+        
+        Args:
+            results: Results from parse_packed_response
+            attempts: Attempt records of the packed request
+            payload_bytes: Payload size of the packed request
+            
+        Returns:
+            The same results
+        """
+        for position, result in enumerate(results):
+            result["attempts"] = attempts if position == 0 else []
+            result["payload_bytes"] = payload_bytes // len(results)
+            result["pack"] = {"size": len(results), "position": position}
+        return results
+    
+    def analyze_part(self, pdf_path: str, deployment_name: str = "gpt-5-chat",
+                     rules: Optional[Dict] = None) -> Dict:
+        """
+        Analyze a technical drawing PDF and predict manufacturing characteristics
+        
+        Args:
+            pdf_path: Path to PDF file
+            deployment_name: Azure OpenAI deployment name (defaults to gpt-5-chat)
+            rules: rule_check output already computed for a batch (run here when None)
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        print(f"Analyzing: {pdf_path}")
+        started = time.perf_counter()
+        
+        result, rules, cache_key = self.precheck(pdf_path, deployment_name, rules)
+        if result is not None:
+            return result
+        return self.analyze_checked(pdf_path, deployment_name, rules, cache_key, started)
+    
+    def precheck(self, pdf_path: str, deployment_name: str,
+                 rules: Optional[Dict] = None) -> Tuple[Optional[Dict], Optional[Dict], Optional[str]]:
+        """
+        Resolve a drawing from the rules or the result cache before anything is rendered
+        
+        Args:
+            pdf_path: Path to PDF file
+            deployment_name: Azure OpenAI deployment name
+            rules: rule_check output already computed for a batch (run here when None)
+            
+        Returns:
+            Tuple of (result when the rules, the cache or a near-duplicate already
+            answer, else None; rule_check output; cache key)
+        """
+        if rules is None:
+            rules = self.rule_check(pdf_path)
+        result = self.rules_result(rules, pdf_path)
+        if result is not None:
+            return result, rules, None
+        
+        cache_key = self.cache_key(pdf_path, deployment_name)
+        cached = self.cached_result(cache_key, pdf_path)
+        if cached is not None:
+            return self.apply_rules(cached, rules), rules, cache_key
+        
+        duplicate = self.duplicate_result(pdf_path, deployment_name, rules)
+        if duplicate is not None:
+            return self.apply_rules(duplicate, rules), rules, cache_key
+        return None, rules, cache_key
+    
+    def analyze_checked(self, pdf_path: str, deployment_name: str, rules: Optional[Dict],
+                        cache_key: Optional[str], started: float) -> Dict:
+        """
+        Render and analyze a drawing that precheck did not resolve
+        
+        Args:
+            pdf_path: Path to PDF file
+            deployment_name: Azure OpenAI deployment name
+            rules: rule_check output from precheck
+            cache_key: Cache key from precheck
+            started: time.perf_counter() value when work on the drawing started
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        result = cascade = screen_attempts = None
+        if self.cascade_deployment:
+            messages, extracted_text = self.screening_messages(pdf_path)
+            result, cascade, screen_attempts = self.screen_part(messages, extracted_text, pdf_path)
+        
+        if result is None:
+            vision_started = time.perf_counter()
+            messages, extracted_text = self.prepare_messages(pdf_path)
+            result = self.request_analysis(messages, extracted_text, pdf_path, deployment_name)
+            if self.cascade_deployment:
+                cascade["vision_s"] = round(time.perf_counter() - vision_started, 3)
+        
+        return self.finish_analysis(result, rules, cache_key, started, cascade, screen_attempts)
+    
+    def finish_analysis(self, result: Dict, rules: Optional[Dict], cache_key: Optional[str], started: float,
+                        cascade: Optional[Dict] = None, screen_attempts: Optional[List[Dict]] = None) -> Dict:
+        """
+        Time, cache and apply rules to the result of analyze_checked
+        
+        Args:
+            result: Result of the first pass or the vision request
+            rules: rule_check output from precheck
+            cache_key: Cache key from precheck
+            started: time.perf_counter() value when work on the drawing started
+            cascade: Cascade record from screen_part, if a cascade ran
+            screen_attempts: First-pass attempt records from screen_part
+            
+        Returns:
+            The finished result
+        """
+        if cascade is not None:
+            self.finish_cascade(result, cascade, screen_attempts)
+        result["elapsed_s"] = round(time.perf_counter() - started, 3)
+        # The cache holds the model's answer; rules are applied on every read
+        self.store_result(cache_key, result)
+        return self.apply_rules(result, rules)
+    
+    def run_steps(self, steps: Generator) -> Any:
+        """
+        Drive a request generator, sending each request it yields to the API
+        
+        The *_steps generators hold the request logic shared by both analyzers:
+        each API call is yielded as (params, attempts, kind) for create_completion,
+        and the response is sent back in (or the call's exception thrown in).
+        AsyncManufacturingPartAnalyzer overrides only this driver to await the calls.
+        
+        Args:
+            steps: Generator from screen_steps, analysis_steps or packed_steps
+            
+        Returns:
+            The generator's return value
+        """
+        try:
+            request = next(steps)
+            while True:
+                try:
+                    response = self.create_completion(*request)
+                except Exception as e:
+                    request = steps.throw(e)
+                else:
+                    request = steps.send(response)
+        except StopIteration as stop:
+            return stop.value
+    
+    def screen_part(self, messages: List[Dict], extracted_text: str,
+                    pdf_path: str) -> Tuple[Optional[Dict], Dict, List[Dict]]:
+        """
+        Run the cascade's cheap first pass on cascade_deployment
+        
+        Args:
+            messages: Chat messages from screening_messages
+            extracted_text: Text extracted from the PDF
+            pdf_path: Path to the analyzed PDF
+            
+        Returns:
+            Tuple of (result, or None when the drawing must be escalated to the
+            vision request; cascade record; first-pass attempt records), or an
+            awaitable of it in the async analyzer
+        """
+        return self.run_steps(self.screen_steps(messages, extracted_text, pdf_path))
+    
+    def screen_steps(self, messages: List[Dict], extracted_text: str, pdf_path: str) -> Generator:
+        """Request steps of screen_part, driven by run_steps"""
+        print(f"Screening with {self.cascade_deployment}...")
+        attempts = []
+        started = time.perf_counter()
+        try:
+            params = self.completion_params(messages, self.cascade_deployment, screening=True)
+            response = yield params, attempts, "screen"
+            result, reason, confidence = self.screening_outcome(response.choices[0].message.content,
+                                                                pdf_path, extracted_text)
+        except Exception as e:
+            result, reason, confidence = None, f"error: {type(e).__name__}", None
+        
+        cascade = {
+            "escalated": result is None,
+            "reason": reason,
+            "confidence": confidence,
+            "screen_s": round(time.perf_counter() - started, 3),
+            "vision_s": None
+        }
+        if result is None:
+            print(f"Escalating to vision request ({reason})")
+        else:
+            result["attempts"] = attempts
+            result["payload_bytes"] = payload_size(messages)
+        return result, cascade, attempts
+    
+    def request_analysis(self, messages: List[Dict], extracted_text: str, pdf_path: str,
+                         deployment_name: str = "gpt-5-chat") -> Dict:
+        """
+        Send prepared messages to Azure OpenAI and parse the reply
+        
+        Args:
+            messages: Chat messages from prepare_messages
+            extracted_text: Text extracted from the PDF
+            pdf_path: Path to the analyzed PDF
+            deployment_name: Azure OpenAI deployment name (defaults to gpt-5-chat)
+            
+        Returns:
+            Dictionary with analysis results, or an error record (an awaitable of
+            it in the async analyzer)
+        """
+        return self.run_steps(self.analysis_steps(messages, extracted_text, pdf_path, deployment_name))
+    
+    def analysis_steps(self, messages: List[Dict], extracted_text: str, pdf_path: str,
+                       deployment_name: str) -> Generator:
+        """Request steps of request_analysis, driven by run_steps"""
+        # Call Azure OpenAI
+        print("Calling Azure OpenAI for analysis...")
+        attempts = []
+        payload_bytes = payload_size(messages)
+        try:
+            response = yield self.completion_params(messages, deployment_name), attempts, "analysis"
+            result_text = response.choices[0].message.content
+            
+            for reask in range(self.retry_policy.json_reasks + 1):
+                try:
+                    result = self.parse_response(result_text, pdf_path, extracted_text)
+                    break
+                except ValueError:
+                    if reask == self.retry_policy.json_reasks:
+                        raise
+                    print("Response was not valid JSON, asking the model to reformat it...")
+                    response = yield self.reask_params(result_text, deployment_name), attempts, "json_reask"
+                    result_text = response.choices[0].message.content
+            
+            result["attempts"] = attempts
+            result["payload_bytes"] = payload_bytes
+            return result
+            
+        except Exception as e:
+            print(f"Error during analysis: {e}")
+            return {
+                "error": str(e),
+                "source_file": os.path.basename(pdf_path),
+                "attempts": attempts,
+                "payload_bytes": payload_bytes
+            }
+    
+    def create_completion(self, params: Dict, attempts: List[Dict], kind: str = "analysis"):
+        """
+        Call chat.completions.create under the rate limiter and retry policy
+        
+        Transient failures are retried with decorrelated jitter; a throttled
+        request also pauses the rate limiter for the Retry-After duration.
+        
+        Args:
+            params: Request parameters from completion_params
+            attempts: List that receives a timing record for every attempt
+            kind: Label stored on the attempt records
+            
+        Returns:
+            Chat completion response
+        """
+        tokens = self.request_tokens(params)
+        delay = self.retry_policy.base_delay
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(tokens)
+            started = time.perf_counter()
+            try:
+                response = self.client.chat.completions.create(**params)
+            except Exception as e:
+                delay = self.failed_attempt(e, kind, attempt, started, delay, attempts)
+                time.sleep(delay)
+                continue
+            
+            self.completed_attempt(response, kind, attempt, started, tokens, attempts)
+            return response
+    
+    def request_tokens(self, params: Dict) -> int:
+        """
+        Token estimate charged to the rate limiter for a request
+        
+        Args:
+            params: Request parameters from completion_params
+            
+        Returns:
+            Estimated tokens, or 0 without a rate limiter
+        """
+        if self.rate_limiter is None:
+            return 0
+        return estimate_request_tokens(params["messages"], params.get("max_tokens", 0))
+    
+    def failed_attempt(self, error: Exception, kind: str, attempt: int, started: float, delay: float,
+                       attempts: List[Dict]) -> float:
+        """
+        Record a failed API call and decide whether to retry it
+        
+        Args:
+            error: Exception raised by the call
+            kind: Label stored on the attempt record
+            attempt: Attempt number (1-based)
+            started: time.perf_counter() value when the attempt started
+            delay: Delay before this attempt
+            attempts: List that receives the attempt record
+            
+        Returns:
+            Seconds to wait before the next attempt
+            
+        Raises:
+            The original exception when the retry policy gives up
+        """
+        retry_after = retry_after_seconds(error)
+        if isinstance(error, RateLimitError) and self.rate_limiter is not None:
+            self.rate_limiter.backoff(retry_after)
+        next_delay = self.retry_policy.on_failure(error, attempt, delay, retry_after)
+        attempts.append(attempt_record(kind, attempt, started, error, next_delay or 0.0))
+        if next_delay is None:
+            raise error
+        print(f"Attempt {attempt} failed ({type(error).__name__}), retrying in {next_delay:.1f}s...")
+        return next_delay
+    
+    def completed_attempt(self, response, kind: str, attempt: int, started: float, tokens: int,
+                          attempts: List[Dict]):
+        """
+        Record a successful API call and settle its rate limiter charge
+        
+        Args:
+            response: Chat completion response
+            kind: Label stored on the attempt record
+            attempt: Attempt number (1-based)
+            started: time.perf_counter() value when the attempt started
+            tokens: Tokens charged to the rate limiter for the request
+            attempts: List that receives the attempt record
+        """
+        attempts.append(attempt_record(kind, attempt, started))
+        if self.rate_limiter is not None:
+            usage = getattr(response, "usage", None)
+            self.rate_limiter.reconcile(tokens, usage.total_tokens if usage else None)
+    
+    def save_results(self, results: List[Dict], output_file: str):
+        """
+        Write analysis results to a JSON file
+        
+        Args:
+            results: List of analysis results
+            output_file: Output JSON file path
+        """
+        with open(output_file, 'w') as f:
+            json.dump(results, f, indent=2)
+        
+        print(f"Results saved to: {output_file}")
+    
+    def finish_batch(self, checkpoint: BatchCheckpoint, results: List[Dict]):
+        """
+        Close the checkpoint and write the final output
+        
+        Args:
+            checkpoint: Batch checkpoint for this run
+            results: List of analysis results
+        """
+        checkpoint.close()
+        if checkpoint.jsonl:
+            print(f"Results saved to: {checkpoint.output_file}")
+        else:
+            self.save_results(results, checkpoint.output_file)
+        
+        cost = retry_cost(results)
+        if cost["retries"] or cost["json_reasks"]:
+            print(f"Retries: {cost['retries']} retried attempts, {cost['json_reasks']} JSON re-asks, "
+                  f"{cost['failed_attempt_s'] + cost['backoff_s']:.1f}s spent on failed attempts and backoff")
+        
+        cascade = cascade_summary(results)
+        if cascade["screened"]:
+            print(f"Cascade: {cascade['escalated']} of {cascade['screened']} drawings escalated to vision "
+                  f"({cascade['escalation_rate'] * 100:.1f}%), first pass {cascade['screen_s_mean']:.2f}s avg, "
+                  f"vision {cascade['vision_s_mean']:.2f}s avg")
+            if cascade["reasons"]:
+                print("Escalation reasons: " + ", ".join(f"{reason} {count}"
+                                                         for reason, count in cascade["reasons"].items()))
+        
+        duplicates = sum("duplicate_of" in result for result in results)
+        if duplicates:
+            print(f"Near-duplicates: {duplicates} drawings reused the result of an indexed drawing")
+        self.save_duplicate_index()
+    
+    def analyze_batch(self, pdf_directory: str, output_file: str = "analysis_results.json",
+                      deployment_name: str = "gpt-5-chat", resume: bool = False) -> List[Dict]:
+        """
+        Analyze multiple PDF files in a directory
+        
+        Args:
+            pdf_directory: Directory containing PDF files
+            output_file: Output file path; use .jsonl to checkpoint after every drawing
+            deployment_name: Azure OpenAI deployment name (defaults to gpt-5-chat)
+            resume: Skip drawings already completed successfully in output_file
+            
+        Returns:
+            List of analysis results
+        """
+        pdf_files = list(Path(pdf_directory).glob("*.pdf"))
+        results: List[Optional[Dict]] = [None] * len(pdf_files)
+        
+        print(f"Found {len(pdf_files)} PDF files to analyze")
+        
+        checkpoint = BatchCheckpoint(output_file, resume=resume)
+        checks = self.batch_rule_checks(pdf_files, checkpoint.completed)
+        pack = DrawingPack(self.pack_size, self.pack_token_budget)
+        
+        def record(entries: List[Tuple], outcomes: List[Dict]):
+            for (idx, pdf_path, _, _), result in zip(entries, outcomes):
+                results[idx] = result
+                checkpoint.record(result)
+                print(f"Completed: {os.path.basename(pdf_path)}\n")
+        
+        try:
+            for idx, pdf_file in enumerate(pdf_files):
+                if pdf_file.name in checkpoint.completed:
+                    results[idx] = checkpoint.completed[pdf_file.name]
+                    continue
+                if self.pack_size == 1:
+                    record([(idx, str(pdf_file), None, None)],
+                           [self.analyze_part(str(pdf_file), deployment_name, checks[idx])])
+                    continue
+                
+                started = time.perf_counter()
+                result, rules, cache_key = self.precheck(str(pdf_file), deployment_name, checks[idx])
+                entry = (idx, str(pdf_file), rules, cache_key)
+                if result is not None:
+                    record([entry], [result])
+                    continue
+                tokens = self.pack_cost(str(pdf_file))
+                if tokens is None:
+                    print(f"Analyzing: {pdf_file}")
+                    record([entry], [self.analyze_checked(str(pdf_file), deployment_name, rules, cache_key,
+                                                          started)])
+                    continue
+                if not pack.fits(tokens):
+                    entries = pack.take()
+                    record(entries, self.analyze_pack(entries, deployment_name))
+                pack.add(entry, tokens)
+            
+            if pack.entries:
+                entries = pack.take()
+                record(entries, self.analyze_pack(entries, deployment_name))
+        finally:
+            checkpoint.close()
+        
+        # Save results
+        self.finish_batch(checkpoint, results)
+        return results
+
+
+    def submit_batch(self, pdf_directory: str, manifest_file: str = "batch_manifest.json",
+                     deployment_name: str = "gpt-5-chat") -> Dict:
+        """
+        Submit every drawing in a directory as Azure OpenAI Batch API jobs
+        
+        Drawings answered by the rules or the result cache are resolved
+        immediately. The rest are rendered and written as one request per line
+        to JSONL files next to the manifest. A new file is started whenever the
+        next request would take a file over BATCH_MAX_FILE_BYTES or
+        BATCH_MAX_REQUESTS, and each file is uploaded and submitted as its own
+        batch. Cascade and packing settings do not apply to batch jobs.
+        
+        Args:
+            pdf_directory: Directory containing PDF files
+            manifest_file: JSON file recording the batch ids and how requests map back to drawings
+            deployment_name: Azure OpenAI global batch deployment name
+            
+        Returns:
+            The manifest dictionary
+        """
+        pdf_files = list(Path(pdf_directory).glob("*.pdf"))
+        stem = Path(manifest_file).with_suffix("")
+        entries = []
+        batches = []
+        f = None
+        
+        print(f"Found {len(pdf_files)} PDF files to submit")
+        checks = self.batch_rule_checks(pdf_files)
+        
+        try:
+            for idx, pdf_file in enumerate(pdf_files):
+                result, rules, cache_key = self.precheck(str(pdf_file), deployment_name, checks[idx])
+                if result is not None:
+                    entries.append({"source_file": pdf_file.name, "result": result})
+                    continue
+                print(f"Preparing: {pdf_file}")
+                messages, extracted_text = self.prepare_messages(str(pdf_file))
+                custom_id = f"{idx}-{pdf_file.name}"
+                line = batch_request_line(custom_id, self.completion_params(messages, deployment_name))
+                size = len(line.encode())
+                if size > BATCH_MAX_FILE_BYTES:
+                    entries.append({"source_file": pdf_file.name, "result": {
+                        "error": f"Request of {size // (1024 * 1024)} MB exceeds the Batch API's "
+                                 f"{BATCH_MAX_FILE_BYTES // (1024 * 1024)} MB input file limit",
+                        "source_file": pdf_file.name
+                    }})
+                    continue
+                
+                if (f is None or batches[-1]["requests"] >= BATCH_MAX_REQUESTS
+                        or batches[-1]["bytes"] + size > BATCH_MAX_FILE_BYTES):
+                    if f is not None:
+                        f.close()
+                    requests_file = f"{stem}.requests-{len(batches) + 1:03d}.jsonl"
+                    f = open(requests_file, 'w')
+                    batches.append({"requests_file": requests_file, "requests": 0, "bytes": 0,
+                                    "batch_id": None, "input_file_id": None})
+                f.write(line)
+                batches[-1]["requests"] += 1
+                batches[-1]["bytes"] += size
+                entries.append({
+                    "source_file": pdf_file.name,
+                    "custom_id": custom_id,
+                    "cache_key": cache_key,
+                    "text_preview": extracted_text[:500],
+                    "rules": {"flags": rules["flags"]} if rules is not None else None,
+                    "drawing_hash": self.drawing_hashes[pdf_file.name][0].tobytes().hex()
+                    if pdf_file.name in self.drawing_hashes else None,
+                    "duplicate_key": self.drawing_hashes[pdf_file.name][1]
+                    if pdf_file.name in self.drawing_hashes else None
+                })
+        finally:
+            if f is not None:
+                f.close()
+        
+        manifest = {
+            "deployment": deployment_name,
+            "batches": batches,
+            "submitted_at": time.time(),
+            "entries": entries
+        }
+        
+        try:
+            for part in batches:
+                with open(part["requests_file"], 'rb') as f:
+                    uploaded = self.batch_client.files.create(file=f, purpose="batch")
+                batch = self.batch_client.batches.create(
+                    input_file_id=uploaded.id,
+                    endpoint=BATCH_ENDPOINT,
+                    completion_window="24h"
+                )
+                part["batch_id"] = batch.id
+                part["input_file_id"] = uploaded.id
+                print(f"Submitted batch {batch.id} ({part['requests']} requests, "
+                      f"{part['bytes'] / (1024 * 1024):.1f} MB)")
+            if not batches:
+                print("Every drawing was resolved locally; no batch submitted")
+        finally:
+            # Batches submitted before a failure can still be collected
+            with open(manifest_file, 'w') as f:
+                json.dump(manifest, f, indent=2)
+            print(f"Manifest saved to: {manifest_file}")
+        return manifest
+    
+    def wait_for_batch(self, batch_id: str, poll_interval: float = 60.0, timeout: Optional[float] = None):
+        """
+        Poll a Batch API job until it reaches a terminal status
+        
+        Args:
+            batch_id: Id of the batch job
+            poll_interval: Seconds between status checks
+            timeout: Give up after this many seconds (None waits indefinitely)
+            
+        Returns:
+            The final batch object
+            
+        Raises:
+            TimeoutError: If the batch is still running after timeout seconds
+        """
+        started = time.monotonic()
+        while True:
+            batch = self.batch_client.batches.retrieve(batch_id)
+            counts = batch.request_counts
+            if counts is not None:
+                print(f"Batch {batch_id}: {batch.status} "
+                      f"({counts.completed} completed, {counts.failed} failed of {counts.total})")
+            else:
+                print(f"Batch {batch_id}: {batch.status}")
+            if batch.status in TERMINAL_STATUSES:
+                return batch
+            if timeout is not None and time.monotonic() - started + poll_interval > timeout:
+                raise TimeoutError(f"Batch {batch_id} still {batch.status} after {timeout:.0f}s")
+            time.sleep(poll_interval)
+    
+    def batch_result(self, line: Optional[Dict], entry: Dict) -> Dict:
+        """
+        Turn one batch output line into an analysis result
+        
+        Args:
+            line: Output or error file line for the entry's custom_id (None if missing)
+            entry: Manifest entry of the drawing
+            
+        Returns:
+            Dictionary with analysis results, or an error record
+        """
+        source_file = entry["source_file"]
+        if line is None:
+            return {"error": "No batch output for this drawing", "source_file": source_file}
+        
+        response = line.get("response") or {}
+        body = response.get("body") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            error = line.get("error") or body.get("error") or {}
+            message = error.get("message") or f"Batch request failed with status {response.get('status_code')}"
+            return {"error": message, "source_file": source_file}
+        
+        try:
+            result = self.parse_response(body["choices"][0]["message"]["content"], source_file,
+                                         entry["text_preview"])
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            return {"error": f"Could not parse batch output: {e}", "source_file": source_file}
+        
+        if entry.get("drawing_hash") and entry.get("duplicate_key") and self.duplicate_index is not None:
+            self.drawing_hashes[source_file] = (np.frombuffer(bytes.fromhex(entry["drawing_hash"]), dtype=np.uint8),
+                                                entry["duplicate_key"])
+        self.store_result(entry["cache_key"], result)
+        return self.apply_rules(result, entry["rules"])
+    
+    def collect_batch(self, manifest_file: str = "batch_manifest.json",
+                      output_file: str = "analysis_results.json", poll_interval: float = 60.0,
+                      timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Wait for every submitted batch job and map their outputs back to drawings
+        
+        Drawings whose batch could not be submitted come back as error records.
+        
+        Args:
+            manifest_file: Manifest written by submit_batch
+            output_file: Output file path (.json or .jsonl)
+            poll_interval: Seconds between status checks
+            timeout: Give up after this many seconds (None waits indefinitely)
+            
+        Returns:
+            List of analysis results, in the same order as submitted
+        """
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+        
+        # Manifests written before requests were split hold a single batch_id
+        batch_ids = [part["batch_id"] for part in manifest.get("batches", [])]
+        if manifest.get("batch_id"):
+            batch_ids.append(manifest["batch_id"])
+        
+        outputs = {}
+        started = time.monotonic()
+        for batch_id in batch_ids:
+            if batch_id is None:
+                continue
+            remaining = None if timeout is None else max(0.0, timeout - (time.monotonic() - started))
+            batch = self.wait_for_batch(batch_id, poll_interval, remaining)
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    outputs.update(parse_batch_output(self.batch_client.files.content(file_id).text))
+        
+        checkpoint = BatchCheckpoint(output_file)
+        results = []
+        try:
+            for entry in manifest["entries"]:
+                if "result" in entry:
+                    result = entry["result"]
+                else:
+                    result = self.batch_result(outputs.get(entry["custom_id"]), entry)
+                results.append(result)
+                checkpoint.record(result)
+        finally:
+            checkpoint.close()
+        
+        failed = sum("error" in result for result in results)
+        print(f"Collected {len(results)} results ({failed} failed)")
+        self.finish_batch(checkpoint, results)
+        return results
+
+
+class AsyncManufacturingPartAnalyzer(ManufacturingPartAnalyzer):
+    """
+    Asynchronous analyzer that keeps several Azure OpenAI requests in flight
+    """
+    
+    client_class = AsyncAzureOpenAI
+    
+    async def analyze_part(self, pdf_path: str, deployment_name: str = "gpt-5-chat",
+                           rules: Optional[Dict] = None) -> Dict:
+        """
+        Analyze a technical drawing PDF without blocking the event loop
+        
+        Args:
+            pdf_path: Path to PDF file
+            deployment_name: Azure OpenAI deployment name (defaults to gpt-5-chat)
+            rules: rule_check output already computed for a batch (run here when None)
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        print(f"Analyzing: {pdf_path}")
+        started = time.perf_counter()
+        
+        # Hashing and rendering are CPU-bound, so keep them off the event loop
+        loop = asyncio.get_running_loop()
+        result, rules, cache_key = await loop.run_in_executor(None, self.precheck, pdf_path, deployment_name,
+                                                              rules)
+        if result is not None:
+            return result
+        return await self.analyze_checked(pdf_path, deployment_name, rules, cache_key, started)
+    
+    async def analyze_checked(self, pdf_path: str, deployment_name: str, rules: Optional[Dict],
+                              cache_key: Optional[str], started: float, prepared=None,
+                              executor: Optional[ProcessPoolExecutor] = None) -> Dict:
+        """
+        Render and analyze a drawing that precheck did not resolve
+        
+        Args:
+            pdf_path: Path to PDF file
+            deployment_name: Azure OpenAI deployment name
+            rules: rule_check output from precheck
+            cache_key: Cache key from precheck
+            started: time.perf_counter() value when work on the drawing started
+            prepared: Awaitable already preparing the first request's messages
+                      (screening_messages with a cascade, otherwise prepare_messages)
+            executor: Executor for rendering (defaults to the event loop's thread pool)
+            
+        Returns:
+            Dictionary with analysis results, or an error record if rendering failed
+        """
+        loop = asyncio.get_running_loop()
+        if prepared is None:
+            prepare = self.screening_messages if self.cascade_deployment else self.prepare_messages
+            prepared = loop.run_in_executor(executor, prepare, pdf_path)
+        try:
+            messages, extracted_text = await prepared
+        except Exception as e:
+            print(f"Error rendering {os.path.basename(pdf_path)}: {e}")
+            return {"error": str(e), "source_file": os.path.basename(pdf_path)}
+        
+        result = cascade = screen_attempts = None
+        if self.cascade_deployment:
+            result, cascade, screen_attempts = await self.screen_part(messages, extracted_text, pdf_path)
+            if result is None:
+                vision_started = time.perf_counter()
+                try:
+                    messages, extracted_text = await loop.run_in_executor(executor, self.prepare_messages,
+                                                                          pdf_path)
+                except Exception as e:
+                    print(f"Error rendering {os.path.basename(pdf_path)}: {e}")
+                    result = {"error": str(e), "source_file": os.path.basename(pdf_path)}
+        
+        if result is None:
+            result = await self.request_analysis(messages, extracted_text, pdf_path, deployment_name)
+            if self.cascade_deployment:
+                cascade["vision_s"] = round(time.perf_counter() - vision_started, 3)
+        
+        return self.finish_analysis(result, rules, cache_key, started, cascade, screen_attempts)
+    
+    async def run_steps(self, steps: Generator) -> Any:
+        """
+        Drive a request generator, awaiting each API call it yields
+        
+        screen_part, request_analysis and request_packed_analysis are inherited
+        and return this coroutine, so they are awaited like async methods.
+        
+        Args:
+            steps: Generator from screen_steps, analysis_steps or packed_steps
+            
+        Returns:
+            The generator's return value
+        """
+        try:
+            request = next(steps)
+            while True:
+                try:
+                    response = await self.create_completion(*request)
+                except Exception as e:
+                    request = steps.throw(e)
+                else:
+                    request = steps.send(response)
+        except StopIteration as stop:
+            return stop.value
+    
+    async def create_completion(self, params: Dict, attempts: List[Dict], kind: str = "analysis"):
+        """
+        Call chat.completions.create under the rate limiter and retry policy
+        
+        Args:
+            params: Request parameters from completion_params
+            attempts: List that receives a timing record for every attempt
+            kind: Label stored on the attempt records
+            
+        Returns:
+            Chat completion response
+        """
+        tokens = self.request_tokens(params)
+        delay = self.retry_policy.base_delay
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(tokens)
+            started = time.perf_counter()
+            try:
+                response = await self.client.chat.completions.create(**params)
+            except Exception as e:
+                delay = self.failed_attempt(e, kind, attempt, started, delay, attempts)
+                await asyncio.sleep(delay)
+                continue
+            
+            self.completed_attempt(response, kind, attempt, started, tokens, attempts)
+            return response
+    
+    async def analyze_pack(self, entries: List[Tuple], deployment_name: str, started: Optional[float] = None,
+                           prepared=None, executor: Optional[ProcessPoolExecutor] = None) -> List[Dict]:
+        """
+        Analyze several drawings that precheck did not resolve in one request
+        
+        Args:
+            entries: (index, pdf_path, rules, cache_key) for each drawing
+            deployment_name: Azure OpenAI deployment name
+            started: time.perf_counter() value when work on the pack started
+            prepared: Awaitable already running prepare_packed_messages
+            executor: Executor for rendering (defaults to the event loop's thread pool)
+            
+        Returns:
+            Result dictionaries in the same order as entries
+        """
+        loop = asyncio.get_running_loop()
+        started = started or time.perf_counter()
+        pdf_paths = [pdf_path for _, pdf_path, _, _ in entries]
+        
+        if len(entries) > 1:
+            print(f"Analyzing {len(entries)} drawings in one request: "
+                  + ", ".join(os.path.basename(pdf_path) for pdf_path in pdf_paths))
+            if prepared is None:
+                prepared = loop.run_in_executor(executor, self.prepare_packed_messages, pdf_paths)
+            try:
+                messages, texts = await prepared
+                results = await self.request_packed_analysis(messages, texts, pdf_paths, deployment_name)
+            except Exception as e:
+                print(f"Error rendering packed drawings: {e}")
+                results = None
+            if results is not None:
+                return self.finish_pack(results, entries, started)
+            print("Falling back to one request per drawing")
+        
+        return [await self.analyze_checked(pdf_path, deployment_name, rules, cache_key, time.perf_counter(),
+                                           executor=executor)
+                for _, pdf_path, rules, cache_key in entries]
+    
+    async def analyze_batch_async(self, pdf_directory: str, output_file: str = "analysis_results.json",
+                                  deployment_name: str = "gpt-5-chat", concurrency: int = 4,
+                                  render_workers: Optional[int] = None, resume: bool = False) -> List[Dict]:
+        """
+        Analyze multiple PDF files with up to `concurrency` requests in flight
+        
+        PDF parsing and page rendering run in a process pool that feeds a
+        bounded queue consumed by the network stage, so rendering of later
+        drawings overlaps with model latency for earlier ones. With a duplicate
+        index, a drawing that is a near-duplicate of one still in flight waits
+        for that result instead of being sent as well.
+        
+        Args:
+            pdf_directory: Directory containing PDF files
+            output_file: Output file path; use .jsonl to checkpoint after every drawing
+            deployment_name: Azure OpenAI deployment name (defaults to gpt-5-chat)
+            concurrency: Maximum number of drawings analyzed at once
+            render_workers: Rendering processes (defaults to the number of CPU cores)
+            resume: Skip drawings already completed successfully in output_file
+            
+        Returns:
+            List of analysis results, in the same order as the PDF files
+        """
+        pdf_files = list(Path(pdf_directory).glob("*.pdf"))
+        results: List[Optional[Dict]] = [None] * len(pdf_files)
+        
+        print(f"Found {len(pdf_files)} PDF files to analyze")
+        
+        loop = asyncio.get_running_loop()
+        # Bound the queue so rendered payloads never pile up far ahead of the network stage
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        
+        checkpoint = BatchCheckpoint(output_file, resume=resume)
+        checks = await loop.run_in_executor(None, self.batch_rule_checks, pdf_files, checkpoint.completed)
+        
+        # Drawings sent to the API in this run, and an event set once each has a result
+        in_flight = None
+        if self.duplicate_index is not None:
+            in_flight = DrawingHashIndex(method=self.duplicate_index.method, hash_size=self.duplicate_index.hash_size)
+        finished: Dict[str, asyncio.Event] = {}
+        
+        async def render_stage(executor: ProcessPoolExecutor):
+            pack = DrawingPack(self.pack_size, self.pack_token_budget)
+            held = []
+            
+            async def submit(entries: List[Tuple]):
+                if len(entries) == 1:
+                    # With a cascade, only the cheap first-pass messages are prepared up front
+                    prepare = self.screening_messages if self.cascade_deployment else self.prepare_messages
+                    future = loop.run_in_executor(executor, prepare, entries[0][1])
+                else:
+                    future = loop.run_in_executor(executor, self.prepare_packed_messages,
+                                                  [pdf_path for _, pdf_path, _, _ in entries])
+                await queue.put((entries, time.perf_counter(), future))
+            
+            async def hold(entry: Tuple, original: str):
+                await finished[original].wait()
+                idx, pdf_path, rules, _ = entry
+                result = await loop.run_in_executor(None, self.indexed_duplicate, os.path.basename(pdf_path))
+                if result is None:
+                    await submit([entry])
+                    return
+                results[idx] = self.apply_rules(result, rules)
+                checkpoint.record(results[idx])
+            
+            for idx, pdf_file in enumerate(pdf_files):
+                if pdf_file.name in checkpoint.completed:
+                    results[idx] = checkpoint.completed[pdf_file.name]
+                    continue
+                # Rule-determined drawings and cache hits are resolved here and never reach the render pool
+                result, rules, cache_key = await loop.run_in_executor(None, self.precheck, str(pdf_file),
+                                                                      deployment_name, checks[idx])
+                if result is not None:
+                    results[idx] = result
+                    checkpoint.record(result)
+                    continue
+                entry = (idx, str(pdf_file), rules, cache_key)
+                if in_flight is not None and pdf_file.name in self.drawing_hashes:
+                    drawing_hash, key = self.drawing_hashes[pdf_file.name]
+                    match = in_flight.nearest(drawing_hash, self.duplicate_distance, key)
+                    if match is not None:
+                        print(f"{pdf_file.name}: near-duplicate of {match[0]}, waiting for its result")
+                        held.append(asyncio.create_task(hold(entry, match[0])))
+                        continue
+                    in_flight.add(drawing_hash, pdf_file.name, key=key)
+                    finished[pdf_file.name] = asyncio.Event()
+                tokens = None
+                if self.pack_size > 1:
+                    tokens = await loop.run_in_executor(None, self.pack_cost, str(pdf_file))
+                if tokens is None:
+                    await submit([entry])
+                    continue
+                if not pack.fits(tokens):
+                    await submit(pack.take())
+                pack.add(entry, tokens)
+            
+            if pack.entries:
+                await submit(pack.take())
+            await asyncio.gather(*held)
+            for _ in range(concurrency):
+                await queue.put(None)
+        
+        async def network_stage(executor: ProcessPoolExecutor):
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                entries, started, future = item
+                if len(entries) == 1:
+                    _, pdf_path, rules, cache_key = entries[0]
+                    print(f"Analyzing: {pdf_path}")
+                    outcomes = [await self.analyze_checked(pdf_path, deployment_name, rules, cache_key, started,
+                                                           prepared=future, executor=executor)]
+                else:
+                    outcomes = await self.analyze_pack(entries, deployment_name, started=started,
+                                                       prepared=future, executor=executor)
+                for (idx, pdf_path, _, _), result in zip(entries, outcomes):
+                    results[idx] = result
+                    checkpoint.record(result)
+                    print(f"Completed: {os.path.basename(pdf_path)}\n")
+                    if os.path.basename(pdf_path) in finished:
+                        finished[os.path.basename(pdf_path)].set()
+        
+        try:
+            # The event loop and the precheck thread pool are running by now, so
+            # start render workers from a clean server process instead of forking
+            with ProcessPoolExecutor(max_workers=render_workers or os.cpu_count(),
+                                     mp_context=multiprocessing.get_context("forkserver")) as executor:
+                await asyncio.gather(render_stage(executor),
+                                     *(network_stage(executor) for _ in range(concurrency)))
+        finally:
+            checkpoint.close()
+        
+        # Save results
+        self.finish_batch(checkpoint, results)
+        return results
+    
+    def analyze_batch(self, pdf_directory: str, output_file: str = "analysis_results.json",
+                      deployment_name: str = "gpt-5-chat", resume: bool = False) -> List[Dict]:
+        """
+        Synchronous entry point that runs analyze_batch_async to completion
+        
+        Args:
+            pdf_directory: Directory containing PDF files
+            output_file: Output file path; use .jsonl to checkpoint after every drawing
+            deployment_name: Azure OpenAI deployment name (defaults to gpt-5-chat)
+            resume: Skip drawings already completed successfully in output_file
+            
+        Returns:
+            List of analysis results
+        """
+        return asyncio.run(self.analyze_batch_async(pdf_directory, output_file, deployment_name,
+                                                    resume=resume))
 
 
 def main():
     """
     Example usage
     """
+    parser = argparse.ArgumentParser(
+        description='Analyze technical drawings with Azure OpenAI',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python manufacturing_part_analyzer.py drawing.pdf
+  python manufacturing_part_analyzer.py drawings/ -o results.json
+  python manufacturing_part_analyzer.py drawings/ -o results.json --concurrency 8
+  python manufacturing_part_analyzer.py drawings/ --refresh
+  python manufacturing_part_analyzer.py drawings/ -o results.jsonl --resume
+  python manufacturing_part_analyzer.py drawings/ --batch-submit
+  python manufacturing_part_analyzer.py --batch-collect -o results.json
+        """
+    )
+    
+    parser.add_argument('path', nargs='?',
+                        help='PDF file or directory of PDFs to analyze')
+    parser.add_argument('-o', '--output',
+                        default='analysis_results.json',
+                        help='Output file for batch results; .jsonl checkpoints every drawing '
+                             '(default: analysis_results.json)')
+    parser.add_argument('--cache-dir',
+                        default='.analysis_cache',
+                        help='Result cache directory (default: .analysis_cache)')
+    parser.add_argument('--cache-max-mb', type=int,
+                        default=500,
+                        help='Evict least recently used cache entries above this size (default: 500)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the result cache')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Ignore cached results and near-duplicate matches but store fresh ones')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip drawings already completed successfully in the output file')
+    parser.add_argument('--concurrency', type=int,
+                        default=1,
+                        help='Drawings analyzed at once in directory runs; above 1 the async pipeline renders '
+                             'in a process pool while requests are in flight (default: 1)')
+    parser.add_argument('--dpi',
+                        default='300',
+                        help='Render resolution, or "auto" to match the vision model\'s input size (default: 300)')
+    parser.add_argument('--max-tiles', type=int,
+                        help='With --dpi auto, cap the 512px tiles billed per page')
+    parser.add_argument('--color-mode', choices=ManufacturingPartAnalyzer.COLOR_MODES,
+                        default='rgb',
+                        help='Page color mode; gray and bilevel shrink payloads for line drawings (default: rgb)')
+    parser.add_argument('--image-format', choices=ManufacturingPartAnalyzer.IMAGE_FORMATS,
+                        default='PNG',
+                        help='Upload codec for page images (default: PNG)')
+    parser.add_argument('--image-quality', type=int,
+                        default=85,
+                        help='JPEG/WEBP quality, 1-100 (default: 85)')
+    parser.add_argument('--payload-budget-kb', type=int,
+                        help='Maximum image payload per request in KB; pages are re-encoded to fit')
+    parser.add_argument('--auto-crop', action='store_true',
+                        help='Crop empty margins and border frames before encoding pages')
+    parser.add_argument('--prioritize-text', action='store_true',
+                        help='Send title-block and notes text first and deduplicate dimensions')
+    parser.add_argument('--rules', choices=ManufacturingPartAnalyzer.RULE_MODES,
+                        default='off',
+                        help='Rule-based pre-classification; short_circuit skips the API for drawings '
+                             'the rules fully determine (default: off)')
+    parser.add_argument('--cascade-deployment',
+                        help='Cheaper deployment for a text-only first pass; drawings are escalated to '
+                             'the full vision request only when it is uncertain or incomplete')
+    parser.add_argument('--cascade-threshold', type=float,
+                        default=0.8,
+                        help='Minimum first-pass confidence accepted without escalation (default: 0.8)')
+    parser.add_argument('--cascade-thumbnails', action='store_true',
+                        help='Add low-detail page thumbnails to the first pass')
+    parser.add_argument('--no-structured-output', action='store_true',
+                        help='Do not request a JSON-schema response_format (for deployments without '
+                             'structured outputs)')
+    parser.add_argument('--pack', type=int,
+                        default=1,
+                        help='Send up to this many single-page drawings per request in batch runs (default: 1)')
+    parser.add_argument('--pack-token-budget', type=int,
+                        default=16000,
+                        help='Estimated prompt tokens allowed per packed request (default: 16000)')
+    parser.add_argument('--batch-submit', action='store_true',
+                        help='Submit the directory as an Azure OpenAI Batch API job instead of analyzing it now')
+    parser.add_argument('--batch-collect', action='store_true',
+                        help='Wait for the job in --batch-manifest and write its results to the output file')
+    parser.add_argument('--batch-manifest',
+                        default='batch_manifest.json',
+                        help='Manifest written by --batch-submit and read by --batch-collect '
+                             '(default: batch_manifest.json)')
+    parser.add_argument('--duplicate-index',
+                        help='Perceptual-hash index file (.npz); near-duplicate drawings reuse the result '
+                             'of the closest indexed drawing, and new results are added to it')
+    parser.add_argument('--duplicate-distance', type=int,
+                        default=3,
+                        help='Largest hash distance in bits treated as a near-duplicate (default: 3)')
+    parser.add_argument('--rpm', type=int,
+                        help='Requests-per-minute quota of the deployment')
+    parser.add_argument('--tpm', type=int,
+                        help='Tokens-per-minute quota of the deployment')
+    
+    args = parser.parse_args()
+    
     # Configure Azure OpenAI credentials
     # You'll need to set these as environment variables or pass them directly
     AZURE_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
@@ -308,23 +2710,70 @@ def main():
         print("export AZURE_OPENAI_DEPLOYMENT='gpt-5-chat'")
         return
     
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024, refresh=args.refresh)
+    
+    rate_limiter = None
+    if args.rpm or args.tpm:
+        rate_limiter = RateLimiter(requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+    
+    duplicate_index = None
+    if args.duplicate_index:
+        duplicate_index = DrawingHashIndex(args.duplicate_index)
+    
+    # Directory runs with concurrency use the async pipeline
+    concurrent = (args.concurrency > 1 and args.path is not None and Path(args.path).is_dir()
+                  and not args.batch_submit)
+    analyzer_class = AsyncManufacturingPartAnalyzer if concurrent else ManufacturingPartAnalyzer
+    
     # Initialize analyzer
-    analyzer = ManufacturingPartAnalyzer(
+    analyzer = analyzer_class(
         azure_endpoint=AZURE_ENDPOINT,
-        api_key=API_KEY
+        api_key=API_KEY,
+        dpi=args.dpi if args.dpi == 'auto' else int(args.dpi),
+        max_tiles=args.max_tiles,
+        color_mode=args.color_mode,
+        image_format=args.image_format,
+        image_quality=args.image_quality,
+        payload_budget=args.payload_budget_kb * 1024 if args.payload_budget_kb else None,
+        auto_crop=args.auto_crop,
+        prioritize_text=args.prioritize_text,
+        rule_mode=args.rules,
+        cascade_deployment=args.cascade_deployment,
+        cascade_threshold=args.cascade_threshold,
+        cascade_thumbnails=args.cascade_thumbnails,
+        structured_output=not args.no_structured_output,
+        pack_size=args.pack,
+        pack_token_budget=args.pack_token_budget,
+        cache=cache,
+        rate_limiter=rate_limiter,
+        duplicate_index=duplicate_index,
+        duplicate_distance=args.duplicate_distance
     )
     
-    # Example: Analyze a single PDF
-    # result = analyzer.analyze_part("path/to/drawing.pdf", deployment_name=DEPLOYMENT_NAME)
-    # print(json.dumps(result, indent=2))
+    if args.batch_collect:
+        analyzer.collect_batch(args.batch_manifest, args.output)
+        return
     
-    # Example: Analyze all PDFs in a directory
-    # results = analyzer.analyze_batch("path/to/pdf/directory", "results.json")
+    if args.path is None:
+        print("Setup complete! Use the analyzer object to process your PDFs.")
+        print("\nExample usage:")
+        print("  result = analyzer.analyze_part('drawing.pdf')")
+        print("  results = analyzer.analyze_batch('pdf_directory/', 'output.json')")
+        return
     
-    print("Setup complete! Use the analyzer object to process your PDFs.")
-    print("\nExample usage:")
-    print("  result = analyzer.analyze_part('drawing.pdf')")
-    print("  results = analyzer.analyze_batch('pdf_directory/', 'output.json')")
+    if args.batch_submit:
+        analyzer.submit_batch(args.path, args.batch_manifest, deployment_name=DEPLOYMENT_NAME)
+    elif concurrent:
+        asyncio.run(analyzer.analyze_batch_async(args.path, args.output, deployment_name=DEPLOYMENT_NAME,
+                                                 concurrency=args.concurrency, resume=args.resume))
+    elif Path(args.path).is_dir():
+        analyzer.analyze_batch(args.path, args.output, deployment_name=DEPLOYMENT_NAME, resume=args.resume)
+    else:
+        result = analyzer.analyze_part(args.path, deployment_name=DEPLOYMENT_NAME)
+        print(json.dumps(result, indent=2))
+        analyzer.save_duplicate_index()
 
 
 if __name__ == "__main__":
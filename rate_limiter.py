@@ -0,0 +1,333 @@
+"""
+Rate Limiter for Manufacturing Part Analyzer
+
+Client-side token buckets that keep requests under the Azure OpenAI deployment's
+requests-per-minute (RPM) and tokens-per-minute (TPM) quotas. Token usage is
+estimated up front from the prompt text and the image tile count, then reconciled
+against the usage the API reports. A 429 response pauses every caller for the
+duration given in its Retry-After header.
+"""
+
+import asyncio
+import base64
+import math
+import struct
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+
+
+# Token cost of a high-detail image: a fixed base plus a charge per 512px tile
+IMAGE_BASE_TOKENS = 85
+IMAGE_TILE_TOKENS = 170
+
+# Used when an image's dimensions cannot be read (2048x768 after scaling = 8 tiles)
+MAX_IMAGE_TOKENS = IMAGE_BASE_TOKENS + 8 * IMAGE_TILE_TOKENS
+
+# Rough characters-per-token ratio for English prompt text
+CHARS_PER_TOKEN = 4
+
+
+# Vision model input geometry: fit within MODEL_MAX_EDGE, then shrink the shortest side
+# to MODEL_SHORT_EDGE, then cover with MODEL_TILE_SIZE tiles
+MODEL_MAX_EDGE = 2048
+MODEL_SHORT_EDGE = 768
+MODEL_TILE_SIZE = 512
+
+
+def model_image_size(width: float, height: float) -> Tuple[float, float]:
+    """
+    Size the vision model downsamples a high-detail image to before tiling
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        (width, height) in pixels as seen by the model
+    """
+    scale = min(1.0, MODEL_MAX_EDGE / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, MODEL_SHORT_EDGE / min(width, height))
+    return width * scale, height * scale
+
+
+def image_tile_count(width: float, height: float) -> int:
+    """
+    Number of 512px tiles the vision model bills for a high-detail image
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        Tile count
+    """
+    width, height = model_image_size(width, height)
+    return math.ceil(width / MODEL_TILE_SIZE) * math.ceil(height / MODEL_TILE_SIZE)
+
+
+def image_size_from_data_url(url: str) -> Optional[Tuple[int, int]]:
+    """
+    Read image dimensions from a base64 data URL without decoding the whole image
+
+    Args:
+        url: data:image/...;base64,... URL
+
+    Returns:
+        (width, height), or None if the format is not recognized
+    """
+    encoded = url.split(",", 1)[-1]
+
+    if url.startswith("data:image/png"):
+        # Signature (8 bytes), IHDR length and type (8 bytes), width, height
+        header = base64.b64decode(encoded[:32])
+        if len(header) >= 24:
+            return struct.unpack(">II", header[16:24])
+        return None
+
+    if url.startswith("data:image/jpeg"):
+        # Walk the marker segments up to the start-of-frame header
+        data = base64.b64decode(encoded[:87384])  # first 64 KB
+        pos = 2
+        while pos + 9 < len(data):
+            if data[pos] != 0xFF:
+                return None
+            marker = data[pos + 1]
+            length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+                return width, height
+            pos += 2 + length
+        return None
+
+    if url.startswith("data:image/webp"):
+        # RIFF header (12 bytes), then a VP8, VP8L or VP8X chunk
+        header = base64.b64decode(encoded[:40])
+        if len(header) < 30 or header[8:12] != b"WEBP":
+            return None
+        chunk = header[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", header[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            bits = int.from_bytes(header[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            width = int.from_bytes(header[24:27], "little") + 1
+            height = int.from_bytes(header[27:30], "little") + 1
+            return width, height
+        return None
+
+    return None
+
+
+def estimate_image_tokens(url: str) -> int:
+    """
+    Estimate the prompt tokens charged for one image
+
+    Args:
+        url: Image data URL
+
+    Returns:
+        Estimated token count
+    """
+    size = image_size_from_data_url(url)
+    if size is None:
+        return MAX_IMAGE_TOKENS
+    return IMAGE_BASE_TOKENS + IMAGE_TILE_TOKENS * image_tile_count(*size)
+
+
+def estimate_request_tokens(messages: List[Dict], max_tokens: int = 0) -> int:
+    """
+    Estimate the tokens a chat request counts against the TPM quota
+
+    Azure counts the prompt plus the requested max_tokens when admitting a request.
+
+    Args:
+        messages: Chat messages
+        max_tokens: Completion token limit of the request
+
+    Returns:
+        Estimated token count
+    """
+    text_chars = 0
+    image_tokens = 0
+
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            text_chars += len(content)
+            continue
+        for part in content:
+            if part["type"] == "text":
+                text_chars += len(part["text"])
+            elif part["type"] == "image_url":
+                # Low-detail images are billed at the base rate regardless of size
+                if part["image_url"].get("detail") == "low":
+                    image_tokens += IMAGE_BASE_TOKENS
+                else:
+                    image_tokens += estimate_image_tokens(part["image_url"]["url"])
+
+    return text_chars // CHARS_PER_TOKEN + image_tokens + max_tokens
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Read the Retry-After delay from an API error's response headers
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        Delay in seconds, or None if the response has no Retry-After header
+    """
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+
+    return None
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter enforcing requests-per-minute and tokens-per-minute budgets
+
+    Safe to share between threads and between coroutines on one event loop.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None,
+                 default_backoff: float = 5.0):
+        """
+        Initialize the limiter
+
+        Args:
+            requests_per_minute: RPM quota of the deployment (None for no limit)
+            tokens_per_minute: TPM quota of the deployment (None for no limit)
+            default_backoff: Pause in seconds after a 429 without a Retry-After header
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.default_backoff = default_backoff
+
+        # Buckets start full so a batch can burst up to one minute of quota
+        self.request_allowance = float(requests_per_minute or 0)
+        self.token_allowance = float(tokens_per_minute or 0)
+        self.blocked_until = 0.0
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.last_refill
+        self.last_refill = now
+        if self.requests_per_minute:
+            self.request_allowance = min(self.requests_per_minute,
+                                         self.request_allowance + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self.token_allowance = min(self.tokens_per_minute,
+                                       self.token_allowance + elapsed * self.tokens_per_minute / 60)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """
+        Take capacity for one request if available
+
+        Returns:
+            0 if the request may proceed, otherwise seconds to wait before retrying
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            if now < self.blocked_until:
+                return self.blocked_until - now
+
+            # A request larger than the whole bucket waits for a full bucket
+            if self.tokens_per_minute:
+                tokens = min(tokens, self.tokens_per_minute)
+
+            wait = 0.0
+            if self.requests_per_minute and self.request_allowance < 1:
+                wait = max(wait, (1 - self.request_allowance) * 60 / self.requests_per_minute)
+            if self.tokens_per_minute and self.token_allowance < tokens:
+                wait = max(wait, (tokens - self.token_allowance) * 60 / self.tokens_per_minute)
+            if wait > 0:
+                return wait
+
+            if self.requests_per_minute:
+                self.request_allowance -= 1
+            if self.tokens_per_minute:
+                self.token_allowance -= tokens
+            return 0.0
+
+    def acquire(self, tokens: int):
+        """
+        Block until a request of the given size fits within both budgets
+
+        Args:
+            tokens: Estimated tokens for the request
+        """
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int):
+        """
+        Wait without blocking the event loop until a request fits within both budgets
+
+        Args:
+            tokens: Estimated tokens for the request
+        """
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """
+        Correct the token bucket once the API reports actual usage
+
+        Args:
+            estimated_tokens: Tokens reserved by acquire
+            actual_tokens: Tokens reported in the response usage (None to skip)
+        """
+        if actual_tokens is None or not self.tokens_per_minute:
+            return
+        with self.lock:
+            self.token_allowance = min(self.tokens_per_minute,
+                                       self.token_allowance + estimated_tokens - actual_tokens)
+
+    def backoff(self, retry_after: Optional[float] = None):
+        """
+        Pause all callers after the service throttled a request
+
+        Args:
+            retry_after: Seconds from the Retry-After header (None for default_backoff)
+        """
+        delay = self.default_backoff if retry_after is None else retry_after
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            # The service's view of our usage is ahead of ours, so start from empty buckets
+            self.request_allowance = min(self.request_allowance, 0.0)
+            self.token_allowance = min(self.token_allowance, 0.0)
@@ -0,0 +1,138 @@
+"""
+Result Cache for Manufacturing Part Analyzer
+
+Content-addressed on-disk cache of analysis results. Entries are keyed by a hash
+of the PDF bytes together with the deployment name, prompt template version and
+render settings, so re-running a batch over an unchanged drawing vault skips
+rendering and API calls entirely.
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 digest of a file without reading it all into memory
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk JSON cache of analysis results with size-based LRU eviction
+    """
+
+    def __init__(self, cache_dir: str = ".analysis_cache", max_bytes: int = 500 * 1024 * 1024,
+                 refresh: bool = False):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory holding cached results
+            max_bytes: Total cache size above which least recently used entries are evicted
+            refresh: Ignore existing entries on lookup but still store new results
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.total_bytes = sum(entry.stat().st_size for entry in self.cache_dir.glob("*.json"))
+
+    def make_key(self, pdf_path: str, deployment_name: str, prompt_version: str,
+                 render_settings: Dict) -> str:
+        """
+        Build the cache key for a drawing and analysis configuration
+
+        Args:
+            pdf_path: Path to PDF file
+            deployment_name: Azure OpenAI deployment name
+            prompt_version: Version of the analysis prompt template
+            render_settings: Settings that affect the rendered page images
+
+        Returns:
+            Hex digest identifying the cache entry
+        """
+        material = {
+            "pdf_sha256": hash_file(pdf_path),
+            "deployment": deployment_name,
+            "prompt_version": prompt_version,
+            "render": render_settings,
+        }
+        encoded = json.dumps(material, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached result
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached result dictionary, or None on a miss (always None when refreshing)
+        """
+        if self.refresh:
+            return None
+
+        entry = self._entry_path(key)
+        try:
+            with open(entry, 'r') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Touch the entry so eviction drops least recently used results first
+        os.utime(entry)
+        return result
+
+    def put(self, key: str, result: Dict):
+        """
+        Store a result and evict old entries if the cache is over budget
+
+        Args:
+            key: Cache key from make_key
+            result: Analysis result dictionary
+        """
+        entry = self._entry_path(key)
+        if entry.exists():
+            self.total_bytes -= entry.stat().st_size
+
+        # Write to a temporary file first so a crash never leaves a torn entry
+        tmp_entry = entry.with_suffix(".tmp")
+        with open(tmp_entry, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp_entry, entry)
+
+        self.total_bytes += entry.stat().st_size
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = sorted(self.cache_dir.glob("*.json"), key=lambda entry: entry.stat().st_mtime)
+        self.total_bytes = sum(entry.stat().st_size for entry in entries)
+
+        for entry in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            size = entry.stat().st_size
+            entry.unlink()
+            self.total_bytes -= size
@@ -0,0 +1,144 @@
+"""
+Retry Policy for Manufacturing Part Analyzer
+
+Decides which Azure OpenAI failures are worth retrying and how long to wait
+between attempts. Delays use decorrelated jitter so concurrent requests that
+fail together do not retry in lockstep, and never undercut a Retry-After header.
+"""
+
+import random
+import time
+from typing import Dict, List, Optional
+
+import openai
+
+
+# HTTP statuses that indicate a transient condition on the service side
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class RetryPolicy:
+    """
+    Retry decisions and decorrelated-jitter backoff for API calls
+    """
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                 json_reasks: int = 1):
+        """
+        Initialize the policy
+
+        Args:
+            max_attempts: Total attempts per request, including the first
+            base_delay: Minimum delay between attempts in seconds
+            max_delay: Maximum delay between attempts in seconds
+            json_reasks: Text-only follow-up requests allowed when a reply is not valid JSON
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.json_reasks = json_reasks
+
+    def is_retryable(self, error: Exception) -> bool:
+        """
+        Whether a failed call could succeed if repeated
+
+        Timeouts, connection failures, throttling and 5xx responses are
+        transient; bad requests, authentication failures and missing
+        deployments are not.
+
+        Args:
+            error: Exception raised by the OpenAI client
+
+        Returns:
+            True if the call should be retried
+        """
+        if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in RETRYABLE_STATUS_CODES
+        return False
+
+    def next_delay(self, previous_delay: float, retry_after: Optional[float] = None) -> float:
+        """
+        Decorrelated jitter: a random delay between base_delay and 3x the previous one
+
+        Args:
+            previous_delay: Delay used before the previous attempt (base_delay for the first retry)
+            retry_after: Seconds requested by the service's Retry-After header, if any
+
+        Returns:
+            Seconds to wait before the next attempt
+        """
+        delay = min(self.max_delay, random.uniform(self.base_delay, previous_delay * 3))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def on_failure(self, error: Exception, attempt: int, previous_delay: float,
+                   retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Decide what to do after a failed attempt
+
+        Args:
+            error: Exception raised by the attempt
+            attempt: 1-based number of the attempt that failed
+            previous_delay: Delay used before that attempt
+            retry_after: Seconds requested by the service's Retry-After header, if any
+
+        Returns:
+            Seconds to wait before retrying, or None to give up and re-raise
+        """
+        if attempt >= self.max_attempts or not self.is_retryable(error):
+            return None
+        return self.next_delay(previous_delay, retry_after)
+
+
+def attempt_record(kind: str, attempt: int, started: float, error: Optional[Exception] = None,
+                   backoff: float = 0.0) -> Dict:
+    """
+    Timing record for one API attempt
+
+    Args:
+        kind: "analysis" for the main request, "screen" for a cascade first pass,
+              "packed" for a multi-drawing request, "json_reask" for a JSON repair request
+        attempt: 1-based attempt number
+        started: time.perf_counter() value when the attempt started
+        error: Exception raised by the attempt, if it failed
+        backoff: Seconds slept after this attempt before the next one
+
+    Returns:
+        Dictionary with attempt timing and outcome
+    """
+    return {
+        "kind": kind,
+        "attempt": attempt,
+        "duration_s": round(time.perf_counter() - started, 3),
+        "error": type(error).__name__ if error is not None else None,
+        "backoff_s": round(backoff, 3),
+    }
+
+
+def retry_cost(results: List[Dict]) -> Dict:
+    """
+    Summarize how much wall time retries cost across a batch
+
+    Args:
+        results: Analysis results carrying "attempts" records
+
+    Returns:
+        Dictionary with attempt counts and seconds spent on failed attempts and backoff
+    """
+    summary = {"attempts": 0, "retries": 0, "json_reasks": 0, "failed_attempt_s": 0.0, "backoff_s": 0.0}
+
+    for result in results:
+        for record in result.get("attempts", []):
+            summary["attempts"] += 1
+            if record["kind"] == "json_reask":
+                summary["json_reasks"] += 1
+            elif record["attempt"] > 1:
+                summary["retries"] += 1
+            if record["error"] is not None:
+                summary["failed_attempt_s"] += record["duration_s"]
+            summary["backoff_s"] += record["backoff_s"]
+
+    return summary
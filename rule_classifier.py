@@ -0,0 +1,301 @@
+"""
+Rule-Based Pre-Classifier for Manufacturing Part Analyzer
+
+Many manufacturing flags are spelled out in a drawing's text: "ZINC PLATED",
+"HEAT TREAT TO", weld callouts in the notes, "PEM" inserts. This module runs a
+compiled keyword/regex engine over extracted drawing text and emits
+high-confidence flags locally. classify_texts evaluates each rule over a
+whole batch of texts with pandas; the analyzer's batch entry points extract
+the text of every drawing up front and classify them in one call.
+
+Each process flag is 1 (explicit positive callout), 0 (explicit negative such
+as "DO NOT PAINT", or a purchased part) or missing (no evidence either way). A
+drawing is fully determined when every flag has a value, and then it does not
+need the API at all.
+
+Usage:
+    python rule_classifier.py [pdf_directory] [ground_truth.xlsx]
+
+Prints a precision report of the rules against the ground-truth workbook used
+by validate_accuracy.py.
+"""
+
+import re
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import fitz  # PyMuPDF
+import pandas as pd
+
+
+# Binary process flags predicted by the analyzer, in prompt order
+PROCESS_KEYS = [
+    'laser_cut', 'saw_shear', 'break_press', 'fab', 'weld', 'painting', 'heat_treat', 'plating',
+    'cnc_machining_turning', 'metal_rolling', 'casting_forging', 'tube_bending', 'metal_spinning',
+    'turret_punch_stamping', 'press', 'inserts',
+]
+
+# Keeps "DO NOT PAINT" or "NO WELDING" from matching the positive callout
+NOT = r"(?<!NOT )(?<!NO )"
+
+# Keeps parts-list fasteners ("#10-32 MACHINE SCREW") and title-block boilerplate
+# ("ALL MACHINED SURFACES 125") from matching the machining callout
+NOT_MACHINING = r"(?!\s+(?:SCREWS?|BOLTS?|KEYS?|NUTS?|SURFACES?)\b)"
+
+# Title-block fields left blank on purpose: "HEAT TREAT: NONE", "PAINT: N/A",
+# "HEAT TREAT NOT REQUIRED"
+NOT_REQUIRED = r"\s*[:\-]?\s*(?:NONE|N/?A|NOT\s+REQ(?:UIRED|'?D)?)\b"
+
+# Keeps a blank title-block field, or a keyword followed by NOT, from matching the positive callout
+NOT_BLANK = r"(?!" + NOT_REQUIRED + r"|\s+NOT\b)"
+
+# Keeps part marking ("PART NO. STAMPED HERE", "INK STAMP P/N") from matching stamping
+NOT_MARKING = r"(?<!NO\.\s)(?<!NO\s)(?<!NUMBER\s)(?<!P/N\s)(?<!INK\s)"
+MARKING_TARGET = r"(?!\s+(?:HERE|ON|WITH|IN|AS|LOCATION|AREA)\b)"
+
+# Keeps layout marks ("CENTER PUNCH HOLE LOCATIONS") from matching turret punching
+NOT_CENTER_PUNCH = r"(?<!CENTER\s)(?<!CENTER-)(?<!CTR\s)(?<!PRICK\s)"
+
+# Explicit callouts that mean a process IS required
+POSITIVE_RULES = {
+    'laser_cut': [r"LASER[\s-]*CUT"],
+    'saw_shear': [r"SAW[\s-]*CUT", r"\bSHEAR(?:ED)?\b", r"CUT\s+TO\s+LENGTH"],
+    'break_press': [r"\bBEND\s+(?:UP|DOWN)\b", r"\b(?:UP|DN|DOWN)\s+\d+(?:\.\d+)?\s*°", r"PRESS\s+BRAKE",
+                    r"BRAKE\s+FORM", r"FLAT\s+PATTERN", r"K[\s-]*FACTOR", r"BEND\s+RELIEF"],
+    'fab': [r"\bWELDMENT\b", r"\bFABRICAT(?:E|ED|ION)\b"],
+    'weld': [NOT + r"\bWELD(?:ED|ING|MENT|S)?\b", r"AWS\s+D1\.\d", r"FILLET\s+WELD", r"\bTACK\s+WELD"],
+    'painting': [NOT + r"\bPAINT(?:ED)?\b" + NOT_BLANK, r"POWDER[\s-]*COAT", r"\bPRIME(?:D|R)\b",
+                 r"\bE-?COAT\b"],
+    'heat_treat': [NOT + r"HEAT[\s-]*TREAT(?:ED|ING|MENT)?\b" + NOT_BLANK, r"CASE[\s-]*HARDEN", r"\bCARBURIZ",
+                   r"INDUCTION\s+HARDEN", r"\bQUENCH", r"\bHRC\b", r"ROCKWELL\s+C"],
+    'plating': [NOT + r"\b(?:ZINC|CHROME|NICKEL|CADMIUM|TIN|ZN)[\s-]*PLAT(?:E|ED|ING)\b", r"ELECTROPLAT",
+                r"ASTM\s+B\s*633", r"\bGALVANIZ"],
+    'cnc_machining_turning': [r"\bMACHIN(?:E|ED|ING)\b" + NOT_MACHINING, r"\bCNC\b", r"\bREAM(?:ED)?\b",
+                              r"\bTURN(?:ED)?\s+(?:DIA|OD|TO)\b"],
+    'metal_rolling': [r"\bROLL(?:ED)?\s+TO\b", r"\bROLL\s+FORM", r"PLATE\s+ROLL"],
+    'casting_forging': [r"\bCASTING\b", r"\b(?:DIE|SAND|INVESTMENT)\s+CAST\b", r"\bFORG(?:ED|ING)\b"],
+    'tube_bending': [r"TUBE\s+BEND", r"MANDREL\s+BEND", r"\bCLR\b"],
+    'metal_spinning': [r"\bSPUN\b", r"METAL\s+SPINNING"],
+    'turret_punch_stamping': [r"\bTURRET\b", NOT_MARKING + r"\bSTAMP(?:ED|ING)\b" + MARKING_TARGET,
+                              r"PROGRESSIVE\s+DIE", NOT_CENTER_PUNCH + r"\bPUNCH(?:ED)?\b(?!\s+MARKS?\b)"],
+    'press': [r"PRESS[\s-]*FIT", r"\bPRESS\s+IN\b", r"\bARBOR\s+PRESS"],
+    'inserts': [r"\bPEM\b", r"SELF[\s-]*CLINCH", r"HELI[\s-]*COIL", r"THREADED\s+INSERT", r"\bRIVNUT",
+                r"CLINCH\s+NUT"],
+}
+
+# Explicit callouts that mean a process is NOT required
+NEGATIVE_RULES = {
+    'painting': [r"DO\s+NOT\s+PAINT", r"\bNO\s+PAINT\b", r"\bUNPAINTED\b", r"\bPAINT(?:ED)?\b" + NOT_REQUIRED],
+    'plating': [r"DO\s+NOT\s+PLATE", r"\bNO\s+PLATING\b", r"\bUNPLATED\b"],
+    'heat_treat': [r"NO\s+HEAT[\s-]*TREAT", r"HEAT[\s-]*TREAT(?:ED|ING|MENT)?\b" + NOT_REQUIRED],
+    'weld': [r"DO\s+NOT\s+WELD", r"\bNO\s+WELD(?:ING)?\b"],
+}
+
+# Purchased and catalog parts have no in-house processes, so every flag is 0
+PURCHASED_PART = r"PURCHASED\s+(?:PART|ITEM)|\bVENDOR\s+ITEM\b|\bCOMMERCIAL\s+PART\b|\bBUY\s+PART\b|\bOFF[\s-]THE[\s-]SHELF\b"
+
+MATERIAL = re.compile(r"\bMAT(ERIA)?'?L\s*[:\-]?\s*([^\n]+)", re.IGNORECASE)
+
+
+def _compile(patterns: Sequence[str]) -> re.Pattern:
+    """Combine patterns into one case-insensitive alternation"""
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+
+
+COMPILED_POSITIVE = {key: _compile(patterns) for key, patterns in POSITIVE_RULES.items()}
+COMPILED_NEGATIVE = {key: _compile(patterns) for key, patterns in NEGATIVE_RULES.items()}
+COMPILED_PURCHASED = re.compile(PURCHASED_PART, re.IGNORECASE)
+
+
+def classify_texts(texts: Sequence[str], index: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Apply the rules to a batch of drawing texts
+
+    Each rule is one compiled regex evaluated over the whole batch with
+    pandas string operations.
+
+    Args:
+        texts: Extracted text of each drawing
+        index: Labels for the rows (e.g. source file names)
+
+    Returns:
+        DataFrame with one nullable Int8 column per process flag (1, 0 or <NA>),
+        plus "material" and a boolean "determined" column
+    """
+    series = pd.Series(list(texts), index=index, dtype=object).fillna("")
+    table = pd.DataFrame(index=series.index)
+
+    purchased = series.str.contains(COMPILED_PURCHASED)
+
+    for key in PROCESS_KEYS:
+        column = pd.Series(pd.NA, index=series.index, dtype="Int8")
+        if key in COMPILED_NEGATIVE:
+            column[series.str.contains(COMPILED_NEGATIVE[key])] = 0
+        column[purchased] = 0
+        # Positive callouts win over negative and purchased-part evidence
+        column[series.str.contains(COMPILED_POSITIVE[key])] = 1
+        table[key] = column
+
+    table["material"] = series.str.extract(MATERIAL)[1].str.strip()
+    table["determined"] = table[PROCESS_KEYS].notna().all(axis=1)
+    return table
+
+
+def rule_flags(row: pd.Series) -> Dict[str, int]:
+    """
+    Flags the rules decided for one drawing
+
+    Args:
+        row: Row of a classify_texts table
+
+    Returns:
+        Dictionary of process key to 0/1 for flags with evidence
+    """
+    return {key: int(row[key]) for key in PROCESS_KEYS if not pd.isna(row[key])}
+
+
+def classify_text(text: str) -> pd.Series:
+    """
+    Apply the rules to a single drawing's text
+
+    Args:
+        text: Extracted drawing text
+
+    Returns:
+        One row of a classify_texts table
+    """
+    return classify_texts([text]).iloc[0]
+
+
+def extract_texts(pdf_files: Sequence[Path]) -> List[str]:
+    """
+    Extract the text of each PDF without rendering any pages
+
+    Args:
+        pdf_files: PDF paths
+
+    Returns:
+        Text of each PDF (empty for files that cannot be opened)
+    """
+    texts = []
+    for pdf_file in pdf_files:
+        try:
+            with fitz.open(str(pdf_file)) as doc:
+                texts.append("\n".join(page.get_text() for page in doc))
+        except Exception as e:
+            print(f"Error reading {pdf_file}: {e}")
+            texts.append("")
+    return texts
+
+
+def precision_report(rules: pd.DataFrame, ground_truth_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compare rule decisions with ground truth
+
+    Combined ground-truth columns (Fab Weld, Press Inserts) are predicted
+    positive when any member flag is 1 and negative when all are 0.
+
+    Args:
+        rules: classify_texts table indexed by source file name
+        ground_truth_df: DataFrame with ground truth values
+
+    Returns:
+        DataFrame per ground-truth column with coverage and precision of positive
+        and negative rule decisions
+    """
+    from validate_accuracy import convert_excel_value, create_process_map, normalize_part_id, normalized_part_ids
+
+    truth = ground_truth_df.copy()
+    truth.index = normalized_part_ids(truth)
+    truth = truth[~truth.index.duplicated()]
+
+    rules = rules.copy()
+    rules.index = rules.index.map(normalize_part_id)
+    rules = rules[rules.index.isin(truth.index)]
+    truth = truth.loc[rules.index]
+
+    columns = {}
+    for pred_key, excel_col in create_process_map().items():
+        columns.setdefault(excel_col, []).append(pred_key)
+
+    rows = []
+    for excel_col, keys in columns.items():
+        if excel_col not in truth.columns:
+            continue
+        members = rules[keys]
+        predicted = pd.Series(pd.NA, index=rules.index, dtype="Int8")
+        predicted[(members == 0).fillna(False).all(axis=1)] = 0
+        predicted[(members == 1).fillna(False).any(axis=1)] = 1
+        actual = truth[excel_col].map(convert_excel_value)
+
+        positive = predicted == 1
+        negative = predicted == 0
+        rows.append({
+            'Column': excel_col,
+            'Drawings': len(rules),
+            'Rule Positives': int(positive.sum()),
+            'Positive Precision': (actual[positive.fillna(False)] == 1).mean() if positive.any() else float('nan'),
+            'Rule Negatives': int(negative.sum()),
+            'Negative Precision': (actual[negative.fillna(False)] == 0).mean() if negative.any() else float('nan'),
+            'Coverage': predicted.notna().mean() if len(rules) else float('nan'),
+        })
+
+    return pd.DataFrame(rows)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description='Evaluate rule-based pre-classification against ground truth',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python rule_classifier.py drawings/ ground_truth.xlsx
+  python rule_classifier.py drawings/ ground_truth.xlsx --output rule_flags.csv
+        """
+    )
+
+    parser.add_argument('pdf_directory', help='Directory containing PDF files')
+    parser.add_argument('ground_truth', nargs='?',
+                        default='ground_truth.xlsx',
+                        help='Path to ground truth Excel file (default: ground_truth.xlsx)')
+    parser.add_argument('-o', '--output',
+                        help='Optional CSV file for the per-drawing rule flags')
+
+    args = parser.parse_args()
+
+    from validate_accuracy import load_ground_truth
+
+    if not Path(args.ground_truth).exists():
+        print(f"Error: Ground truth file not found: {args.ground_truth}")
+        sys.exit(1)
+
+    pdf_files = sorted(Path(args.pdf_directory).glob("*.pdf"))
+    print(f"Extracting text from {len(pdf_files)} PDF files...")
+    rules = classify_texts(extract_texts(pdf_files), index=[pdf_file.name for pdf_file in pdf_files])
+
+    if args.output:
+        rules.to_csv(args.output)
+        print(f"✓ Rule flags saved to: {args.output}")
+
+    report = precision_report(rules, load_ground_truth(args.ground_truth))
+
+    print("\n" + "=" * 100)
+    print("RULE PRECISION BY PARAMETER")
+    print("=" * 100)
+    print(f"{'Parameter':<32} {'Pos':<6} {'Pos Prec':<10} {'Neg':<6} {'Neg Prec':<10} {'Coverage':<10}")
+    print("-" * 100)
+    for _, row in report.iterrows():
+        pos_prec = f"{row['Positive Precision'] * 100:.1f}%" if not pd.isna(row['Positive Precision']) else "-"
+        neg_prec = f"{row['Negative Precision'] * 100:.1f}%" if not pd.isna(row['Negative Precision']) else "-"
+        print(f"{row['Column']:<32} {row['Rule Positives']:<6} {pos_prec:<10} "
+              f"{row['Rule Negatives']:<6} {neg_prec:<10} {row['Coverage'] * 100:>6.1f}%")
+    print("-" * 100)
+    print(f"Fully determined by rules: {int(rules['determined'].sum())} of {len(rules)} drawings")
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,11 +15,20 @@ Requirements:
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+import os
 import sys
 import json
+import inspect
+import hashlib
 import argparse
 from pathlib import Path
 
+from result_cache import hash_file
+
+
+# Column holding normalize_part_id('Part ID') in the ground truth cache
+NORMALIZED_PART_ID = '_normalized_part_id'
+
 
 def normalize_part_id(part_id):
     """
@@ -58,14 +67,165 @@ def convert_excel_value(value):
 
 
 def load_predictions(predictions_file):
-    """Load predictions from JSON file"""
+    """Load predictions from a JSON array or JSONL file"""
+    if str(predictions_file).endswith('.jsonl'):
+        return [pred for chunk in iter_prediction_chunks(predictions_file) for pred in chunk]
     with open(predictions_file, 'r') as f:
         return json.load(f)
 
 
-def load_ground_truth(excel_file):
-    """Load ground truth data from Excel file"""
-    return pd.read_excel(excel_file)
+def iter_prediction_chunks(predictions_file, chunk_size=10000):
+    """
+    Read predictions in fixed-size chunks
+
+    A JSONL file is streamed line by line, so only one chunk is held in
+    memory; blank lines and a truncated last line left behind by a crash are
+    skipped. A JSON array file is loaded whole and then split into chunks.
+
+    Args:
+        predictions_file: Path to predictions JSON or JSONL file
+        chunk_size: Predictions per chunk
+
+    Yields:
+        Lists of at most chunk_size prediction dictionaries
+    """
+    if not str(predictions_file).endswith('.jsonl'):
+        predictions = load_predictions(predictions_file)
+        for start in range(0, len(predictions), chunk_size):
+            yield predictions[start:start + chunk_size]
+        return
+
+    chunk = []
+    with open(predictions_file, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                chunk.append(json.loads(line))
+            except ValueError:
+                continue
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def ground_truth_cache_path(excel_file):
+    """Parquet sidecar file caching a ground truth workbook"""
+    return Path(excel_file).with_suffix('.cache.parquet')
+
+
+def load_ground_truth(excel_file, use_cache=True):
+    """
+    Load ground truth data from Excel file
+
+    With use_cache, the sheet is converted once to a Parquet file next to the
+    workbook, with normalized part IDs precomputed, and later runs read that
+    instead of parsing the workbook. The cache is reused while the workbook's
+    mtime and size are unchanged, or its SHA-256 still matches, and while
+    normalize_part_id() and normalized_part_ids() have not been edited. Without pyarrow, or if the sheet
+    cannot be stored as Parquet, the workbook is read directly.
+
+    Args:
+        excel_file: Path to ground truth Excel file
+        use_cache: Read and write the Parquet sidecar
+
+    Returns:
+        DataFrame with ground truth values
+    """
+    if not use_cache:
+        return pd.read_excel(excel_file)
+
+    cache_file = ground_truth_cache_path(excel_file)
+    stat = os.stat(excel_file)
+    key = {
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'normalizer': hashlib.sha256((inspect.getsource(normalize_part_id) +
+                                      inspect.getsource(normalized_part_ids)).encode()).hexdigest(),
+    }
+
+    cached = None
+    if cache_file.exists():
+        try:
+            cached = pd.read_parquet(cache_file)
+        except Exception as e:
+            print(f"Warning: ignoring ground truth cache {cache_file}: {e}")
+    stored = cached.attrs.get('ground_truth_cache', {}) if cached is not None else {}
+
+    if stored.get('normalizer') == key['normalizer']:
+        if all(stored.get(field) == key[field] for field in ('mtime_ns', 'size')):
+            return cached
+        # Touched or copied but unchanged: refresh the stored mtime
+        key['sha256'] = hash_file(excel_file)
+        if stored.get('sha256') == key['sha256']:
+            save_ground_truth_cache(cached, cache_file, key)
+            return cached
+
+    ground_truth = cacheable_ground_truth(pd.read_excel(excel_file))
+    ground_truth[NORMALIZED_PART_ID] = normalized_part_ids(ground_truth)
+    key.setdefault('sha256', hash_file(excel_file))
+    save_ground_truth_cache(ground_truth, cache_file, key)
+    return ground_truth
+
+
+def cacheable_ground_truth(ground_truth):
+    """
+    Give mixed-type columns a single type so the sheet can be stored as Parquet
+
+    Process columns ("X" marks next to 1/0, booleans, blanks) are converted with
+    convert_excel_value, which is how they are scored anyway. Other columns
+    mixing types, such as Part IDs 12345 next to "12345-01", become text with
+    blanks kept.
+
+    Args:
+        ground_truth: DataFrame read from the workbook
+
+    Returns:
+        DataFrame scoring the same as the input
+    """
+    ground_truth = ground_truth.copy()
+    process_cols = set(create_process_map().values())
+    for column in ground_truth.columns:
+        values = ground_truth[column]
+        if column in process_cols:
+            ground_truth[column] = values.map(convert_excel_value).astype(np.int8)
+        elif values.dtype == object and values.dropna().map(type).nunique() > 1:
+            ground_truth[column] = values.map(lambda value: value if pd.isna(value) else str(value))
+    return ground_truth
+
+
+def save_ground_truth_cache(ground_truth, cache_file, key):
+    """
+    Write the ground truth Parquet cache, warning instead of failing
+
+    Args:
+        ground_truth: DataFrame with ground truth values and normalized part IDs
+        cache_file: Path to Parquet sidecar file
+        key: Workbook mtime, size, SHA-256 and normalizer digest
+    """
+    ground_truth.attrs['ground_truth_cache'] = key
+    try:
+        ground_truth.to_parquet(cache_file, index=False)
+    except Exception as e:
+        print(f"Warning: could not write ground truth cache {cache_file}: {e}")
+
+
+def normalized_part_ids(ground_truth_df):
+    """
+    Normalized part IDs of the ground truth rows
+
+    Args:
+        ground_truth_df: DataFrame with ground truth values
+
+    Returns:
+        Series of normalize_part_id('Part ID'), taken from the cache column when present
+    """
+    if NORMALIZED_PART_ID in ground_truth_df.columns:
+        return ground_truth_df[NORMALIZED_PART_ID]
+    # CUSTOMIZE THIS: Adjust the column name and matching logic
+    return ground_truth_df['Part ID'].astype(str).map(normalize_part_id)
 
 
 def create_process_map():
@@ -121,9 +281,185 @@ def initialize_parameters():
     ]
 
 
-def calculate_accuracy(predictions, ground_truth_df, process_map):
+def index_ground_truth(ground_truth_df):
     """
-    Calculate accuracy for each parameter
+    Index ground truth rows by normalized part ID
+
+    Part IDs are normalized once, so each prediction is matched with a
+    dictionary lookup instead of a scan of the whole table.
+
+    Args:
+        ground_truth_df: DataFrame with ground truth values
+
+    Returns:
+        Dictionary of normalized part ID to row (column name -> value);
+        the first row wins when a part ID appears more than once
+    """
+    part_ids = normalized_part_ids(ground_truth_df)
+    index = {}
+    for part_id, row in zip(part_ids, ground_truth_df.to_dict('records')):
+        index.setdefault(part_id, row)
+    return index
+
+
+def process_columns(process_map):
+    """
+    Group prediction keys by the Excel column they are scored against
+
+    Args:
+        process_map: Mapping of prediction keys to Excel columns
+
+    Returns:
+        Dictionary of Excel column to its prediction keys, in process_map order;
+        combined columns (like Fab Weld = fab + weld) list every member
+    """
+    columns = {}
+    for pred_key, excel_col in process_map.items():
+        columns.setdefault(excel_col, []).append(pred_key)
+    return columns
+
+
+def excel_binary(values):
+    """
+    Vectorized convert_excel_value for a whole column
+
+    Args:
+        values: Series of Excel values
+
+    Returns:
+        Boolean array, True where convert_excel_value would return 1
+    """
+    numeric = pd.to_numeric(values, errors='coerce')
+    if values.dtype == object:
+        # convert_excel_value scores text as 0, even when it looks like a number
+        numeric = numeric.mask(values.map(type) == str)
+    return (numeric.astype(float) > 0).to_numpy()
+
+
+def ground_truth_arrays(ground_truth_df, process_map):
+    """
+    Convert the ground truth process columns to aligned NumPy arrays
+
+    Args:
+        ground_truth_df: DataFrame with ground truth values
+        process_map: Mapping of prediction keys to Excel columns
+
+    Returns:
+        Tuple of (Series of row position by normalized part ID, first row winning;
+        list of process columns present in the ground truth; rows x columns
+        boolean array of actual values)
+    """
+    part_ids = normalized_part_ids(ground_truth_df)
+    positions = pd.Series(np.arange(len(ground_truth_df)), index=part_ids.to_numpy())
+    positions = positions[~positions.index.duplicated()]
+
+    columns = [col for col in process_columns(process_map) if col in ground_truth_df.columns]
+    actual = np.zeros((len(ground_truth_df), len(columns)), dtype=bool)
+    for i, excel_col in enumerate(columns):
+        actual[:, i] = excel_binary(ground_truth_df[excel_col])
+    return positions, columns, actual
+
+
+def prediction_arrays(predictions, process_map, columns):
+    """
+    Convert prediction flags to aligned NumPy arrays
+
+    A combined column is predicted positive when any member flag is 1, and is
+    scored only for predictions that include its first member key.
+
+    Args:
+        predictions: List of prediction dictionaries
+        process_map: Mapping of prediction keys to Excel columns
+        columns: Process columns to build, from ground_truth_arrays
+
+    Returns:
+        Tuple of (array of normalized part IDs; predictions x columns boolean
+        array of predicted values; same-shape boolean array of which entries
+        are scored)
+    """
+    part_ids = np.array([
+        normalize_part_id(pred.get('part_identifier') or pred.get('part_name') or pred.get('source_file', ''))
+        for pred in predictions
+    ], dtype=object)
+
+    members = process_columns(process_map)
+    keys = [key for col in columns for key in members[col]]
+    frame = pd.DataFrame.from_records(predictions, columns=keys) if predictions else pd.DataFrame(columns=keys)
+    flags = frame.eq(1).to_numpy()
+    present = frame.notna().to_numpy()
+
+    predicted = np.zeros((len(predictions), len(columns)), dtype=bool)
+    scored = np.zeros((len(predictions), len(columns)), dtype=bool)
+    start = 0
+    for i, excel_col in enumerate(columns):
+        end = start + len(members[excel_col])
+        predicted[:, i] = flags[:, start:end].any(axis=1)
+        scored[:, i] = present[:, start]
+        start = end
+    return part_ids, predicted, scored
+
+
+def confusion_counts(predictions, ground_truth, process_map):
+    """
+    Count TP/FP/FN/TN for every process column
+
+    Args:
+        predictions: List of prediction dictionaries
+        ground_truth: Output of ground_truth_arrays
+        process_map: Mapping of prediction keys to Excel columns
+
+    Returns:
+        4 x columns integer array of TP, FP, FN and TN counts
+    """
+    positions, columns, truth = ground_truth
+    part_ids, predicted, scored = prediction_arrays(predictions, process_map, columns)
+
+    rows = positions.reindex(part_ids).to_numpy()
+    matched = ~np.isnan(rows)
+    actual = truth[rows[matched].astype(int)]
+    predicted = predicted[matched]
+    scored = scored[matched]
+
+    return np.array([
+        (predicted & actual & scored).sum(axis=0),
+        (predicted & ~actual & scored).sum(axis=0),
+        (~predicted & actual & scored).sum(axis=0),
+        (~predicted & ~actual & scored).sum(axis=0),
+    ], dtype=np.int64)
+
+
+def confusion_report(columns, counts):
+    """
+    Precision, recall and F1 per process column
+
+    Args:
+        columns: Process column names
+        counts: Output of confusion_counts (may be summed over several batches)
+
+    Returns:
+        DataFrame with one row per column; ratios with a zero denominator are NaN
+    """
+    tp, fp, fn, tn = counts.astype(float)
+    total = tp + fp + fn + tn
+    with np.errstate(divide='ignore', invalid='ignore'):
+        report = pd.DataFrame({
+            'Column': columns,
+            'TP': counts[0],
+            'FP': counts[1],
+            'FN': counts[2],
+            'TN': counts[3],
+            'Total': total.astype(np.int64),
+            'Accuracy': (tp + tn) / total,
+            'Precision': tp / (tp + fp),
+            'Recall': tp / (tp + fn),
+            'F1': 2 * tp / (2 * tp + fp + fn),
+        })
+    return report
+
+
+def confusion_matrix(predictions, ground_truth_df, process_map):
+    """
+    Evaluate the binary process columns in a few vectorized passes
 
     Args:
         predictions: List of prediction dictionaries
@@ -131,11 +467,21 @@ def calculate_accuracy(predictions, ground_truth_df, process_map):
         process_map: Mapping of prediction keys to Excel columns
 
     Returns:
-        Dictionary with accuracy statistics for each parameter
+        DataFrame from confusion_report
     """
-    all_params = initialize_parameters()
-    parameter_stats = {param: {'correct': 0, 'total': 0} for param in all_params}
+    ground_truth = ground_truth_arrays(ground_truth_df, process_map)
+    return confusion_report(ground_truth[1], confusion_counts(predictions, ground_truth, process_map))
 
+
+def score_categorical(parameter_stats, predictions, ground_truth_index):
+    """
+    Add Complexity Level, Type and Material results to the running counters
+
+    Args:
+        parameter_stats: Dictionary with accuracy statistics, updated in place
+        predictions: List of prediction dictionaries
+        ground_truth_index: Output of index_ground_truth
+    """
     # Analyze each prediction
     for pred in predictions:
         # Get part identifier (customize based on your data structure)
@@ -146,16 +492,11 @@ def calculate_accuracy(predictions, ground_truth_df, process_map):
         )
 
         # Find matching part in ground truth
-        # CUSTOMIZE THIS: Adjust the column name and matching logic
-        matches = ground_truth_df[
-            ground_truth_df['Part ID'].astype(str).apply(normalize_part_id) == part_id
-        ]
+        actual = ground_truth_index.get(part_id)
 
-        if len(matches) == 0:
+        if actual is None:
             continue
 
-        actual = matches.iloc[0]
-
         # Check Complexity Level
         if 'complexity_level' in pred and 'Complexity Level' in actual:
             parameter_stats['Complexity Level']['total'] += 1
@@ -183,53 +524,102 @@ def calculate_accuracy(predictions, ground_truth_df, process_map):
             if pred_material in actual_material or actual_material in pred_material:
                 parameter_stats['Material']['correct'] += 1
 
-        # Check manufacturing processes
-        for pred_key, excel_col in process_map.items():
-            if pred_key not in pred or excel_col not in actual:
-                continue
 
-            # Handle combined columns (like Fab Weld = fab + weld)
-            if excel_col == 'Fab Weld':
-                if pred_key == 'fab':
-                    parameter_stats[excel_col]['total'] += 1
-                    fab_pred = pred.get('fab', 0)
-                    weld_pred = pred.get('weld', 0)
-                    combined_pred = max(fab_pred, weld_pred)
-                    actual_val = convert_excel_value(actual[excel_col])
+def evaluate_chunks(chunks, ground_truth_df, process_map):
+    """
+    Calculate accuracy over predictions arriving in chunks
 
-                    if combined_pred == actual_val:
-                        parameter_stats[excel_col]['correct'] += 1
+    Counters are accumulated chunk by chunk, so memory is bounded by the
+    ground truth and one chunk rather than the whole prediction set.
 
-            elif excel_col == 'Press Inserts':
-                if pred_key == 'press':
-                    parameter_stats[excel_col]['total'] += 1
-                    press_pred = pred.get('press', 0)
-                    inserts_pred = pred.get('inserts', 0)
-                    combined_pred = max(press_pred, inserts_pred)
-                    actual_val = convert_excel_value(actual[excel_col])
+    Args:
+        chunks: Iterable of lists of prediction dictionaries
+        ground_truth_df: DataFrame with ground truth values
+        process_map: Mapping of prediction keys to Excel columns
 
-                    if combined_pred == actual_val:
-                        parameter_stats[excel_col]['correct'] += 1
-            else:
-                # Single process comparison
-                if pred_key not in ['weld', 'inserts']:  # Skip duplicates
-                    parameter_stats[excel_col]['total'] += 1
-                    predicted = pred[pred_key]
-                    actual_val = convert_excel_value(actual[excel_col])
+    Returns:
+        Tuple of (dictionary with accuracy statistics for each parameter;
+        confusion_report DataFrame for the process columns; number of
+        predictions read)
+    """
+    all_params = initialize_parameters()
+    parameter_stats = {param: {'correct': 0, 'total': 0} for param in all_params}
+    ground_truth_index = index_ground_truth(ground_truth_df)
+    ground_truth = ground_truth_arrays(ground_truth_df, process_map)
+    counts = np.zeros((4, len(ground_truth[1])), dtype=np.int64)
+    predictions_read = 0
+
+    for chunk in chunks:
+        score_categorical(parameter_stats, chunk, ground_truth_index)
+        counts += confusion_counts(chunk, ground_truth, process_map)
+        predictions_read += len(chunk)
+
+    # Check manufacturing processes
+    report = confusion_report(ground_truth[1], counts)
+    for row in report.itertuples():
+        parameter_stats[row.Column]['correct'] += int(row.TP + row.TN)
+        parameter_stats[row.Column]['total'] += int(row.Total)
+
+    return parameter_stats, report, predictions_read
+
+
+def calculate_accuracy(predictions, ground_truth_df, process_map):
+    """
+    Calculate accuracy for each parameter
+
+    Args:
+        predictions: List of prediction dictionaries
+        ground_truth_df: DataFrame with ground truth values
+        process_map: Mapping of prediction keys to Excel columns
+
+    Returns:
+        Dictionary with accuracy statistics for each parameter
+    """
+    return evaluate_chunks([predictions], ground_truth_df, process_map)[0]
 
-                    if predicted == actual_val:
-                        parameter_stats[excel_col]['correct'] += 1
 
-    return parameter_stats
+def bootstrap_intervals(parameter_stats, resamples=2000, confidence=0.95, seed=0):
+    """
+    Bootstrap confidence intervals for each parameter's accuracy
+
+    Resampling a parameter's n correct/incorrect outcomes with replacement
+    yields a Binomial(n, accuracy) number of correct ones, so every column of
+    the correctness matrix is resampled with one binomial draw. All resamples
+    of all parameters come from a single vectorized call, and only the
+    streamed counts are needed.
 
+    Args:
+        parameter_stats: Dictionary with accuracy statistics
+        resamples: Bootstrap resamples per parameter
+        confidence: Two-sided confidence level
+        seed: Random seed, so reports are reproducible
 
-def create_visualization(parameter_stats, output_file='accuracy_report.png'):
+    Returns:
+        Dictionary of parameter to (low, high) accuracy in percent, for
+        parameters with at least one scored prediction
+    """
+    params = [param for param, stats in parameter_stats.items() if stats['total'] > 0]
+    if not params or resamples <= 0:
+        return {}
+
+    totals = np.array([parameter_stats[param]['total'] for param in params])
+    correct = np.array([parameter_stats[param]['correct'] for param in params])
+    rng = np.random.default_rng(seed)
+    samples = rng.binomial(totals, correct / totals, size=(resamples, len(params))) / totals * 100
+
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(samples, [tail, 100 - tail], axis=0)
+    return {param: (lo, hi) for param, lo, hi in zip(params, low, high)}
+
+
+def create_visualization(parameter_stats, output_file='accuracy_report.png', intervals=None):
     """
     Create accuracy visualization
 
     Args:
         parameter_stats: Dictionary with accuracy statistics
         output_file: Path to save the visualization
+        intervals: Optional output of bootstrap_intervals, drawn as error bars
     """
     # Prepare data for plotting
     params = []
@@ -267,6 +657,13 @@ def create_visualization(parameter_stats, output_file='accuracy_report.png'):
     bars_incorrect = ax.barh(y_pos, incorrect_pct, bar_height,
                              left=correct_pct, label='Incorrect', color='#e74c3c', alpha=0.8)
 
+    # Confidence intervals at the end of the correct bars
+    if intervals:
+        low = [correct - intervals[param][0] for param, correct in zip(params, correct_pct)]
+        high = [intervals[param][1] - correct for param, correct in zip(params, correct_pct)]
+        ax.errorbar(correct_pct, y_pos, xerr=[low, high], fmt='none', ecolor='black',
+                    elinewidth=1, capsize=3, label='Confidence interval')
+
     # Customize the plot
     ax.set_xlabel('Accuracy (%)', fontsize=12, fontweight='bold')
     ax.set_ylabel('Parameters', fontsize=12, fontweight='bold')
@@ -318,12 +715,12 @@ def create_visualization(parameter_stats, output_file='accuracy_report.png'):
     return overall_accuracy, overall_correct, overall_total
 
 
-def print_summary_table(parameter_stats):
-    """Print summary table of accuracy statistics"""
+def print_summary_table(parameter_stats, intervals=None):
+    """Print summary table of accuracy statistics, with bootstrap intervals if given"""
     print("\n" + "=" * 80)
     print("ACCURACY BY PARAMETER")
     print("=" * 80)
-    print(f"{'Parameter':<35} {'Correct':<10} {'Total':<10} {'Accuracy':<10}")
+    print(f"{'Parameter':<35} {'Correct':<10} {'Total':<10} {'Accuracy':<10} {'CI' if intervals else ''}")
     print("-" * 80)
 
     # Calculate overall stats
@@ -335,7 +732,10 @@ def print_summary_table(parameter_stats):
             continue
 
         accuracy = (stats['correct'] / stats['total'] * 100) if stats['total'] > 0 else 0
-        print(f"{param:<35} {stats['correct']:<10} {stats['total']:<10} {accuracy:>6.1f}%")
+        interval = ''
+        if intervals and param in intervals:
+            interval = f"   {intervals[param][0]:.1f}-{intervals[param][1]:.1f}%"
+        print(f"{param:<35} {stats['correct']:<10} {stats['total']:<10} {accuracy:>6.1f}%{interval}")
 
         overall_correct += stats['correct']
         overall_total += stats['total']
@@ -347,6 +747,25 @@ def print_summary_table(parameter_stats):
     print("=" * 80)
 
 
+def print_confusion_table(report):
+    """Print precision, recall and F1 for each process column"""
+    print("\n" + "=" * 80)
+    print("PROCESS DETECTION (CONFUSION MATRIX)")
+    print("=" * 80)
+    print(f"{'Parameter':<32} {'TP':<6} {'FP':<6} {'FN':<6} {'TN':<6} {'Precision':<10} {'Recall':<10} {'F1':<8}")
+    print("-" * 80)
+
+    for row in report.itertuples():
+        if row.Total == 0:
+            continue
+        ratios = [f"{value * 100:.1f}%" if not np.isnan(value) else "-"
+                  for value in (row.Precision, row.Recall, row.F1)]
+        print(f"{row.Column:<32} {row.TP:<6} {row.FP:<6} {row.FN:<6} {row.TN:<6} "
+              f"{ratios[0]:<10} {ratios[1]:<10} {ratios[2]:<8}")
+
+    print("=" * 80)
+
+
 def main():
     """Main function"""
     parser = argparse.ArgumentParser(
@@ -355,6 +774,7 @@ def main():
         epilog="""
 Examples:
   python validate_accuracy.py predictions.json ground_truth.xlsx
+  python validate_accuracy.py analysis_results.jsonl ground_truth.xlsx
   python validate_accuracy.py --output accuracy.png
 
 For more information, see: ACCURACY_VALIDATION.md
@@ -363,13 +783,24 @@ For more information, see: ACCURACY_VALIDATION.md
 
     parser.add_argument('predictions', nargs='?',
                         default='analysis_results.json',
-                        help='Path to predictions JSON file (default: analysis_results.json)')
+                        help='Path to predictions JSON or JSONL file (default: analysis_results.json)')
     parser.add_argument('ground_truth', nargs='?',
                         default='ground_truth.xlsx',
                         help='Path to ground truth Excel file (default: ground_truth.xlsx)')
     parser.add_argument('-o', '--output',
                         default='accuracy_report.png',
                         help='Output file for visualization (default: accuracy_report.png)')
+    parser.add_argument('--chunk-size', type=int,
+                        default=10000,
+                        help='Predictions scored per chunk when streaming JSONL (default: 10000)')
+    parser.add_argument('--bootstrap', type=int,
+                        default=2000,
+                        help='Bootstrap resamples for accuracy confidence intervals, 0 to disable (default: 2000)')
+    parser.add_argument('--confidence', type=float,
+                        default=0.95,
+                        help='Confidence level of the intervals (default: 0.95)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Read the ground truth workbook directly, without the Parquet sidecar cache')
 
     args = parser.parse_args()
 
@@ -387,23 +818,27 @@ For more information, see: ACCURACY_VALIDATION.md
         sys.exit(1)
 
     print("Loading data...")
-    predictions = load_predictions(args.predictions)
-    ground_truth = load_ground_truth(args.ground_truth)
+    ground_truth = load_ground_truth(args.ground_truth, use_cache=not args.no_cache)
 
-    print(f"✓ Loaded {len(predictions)} predictions")
     print(f"✓ Loaded {len(ground_truth)} ground truth records")
 
     print("\nCalculating accuracy...")
     process_map = create_process_map()
-    parameter_stats = calculate_accuracy(predictions, ground_truth, process_map)
+    chunks = iter_prediction_chunks(args.predictions, args.chunk_size)
+    parameter_stats, confusion, predictions_read = evaluate_chunks(chunks, ground_truth, process_map)
+    print(f"✓ Scored {predictions_read} predictions")
+
+    intervals = bootstrap_intervals(parameter_stats, args.bootstrap, args.confidence)
 
     print("\nCreating visualization...")
     overall_accuracy, overall_correct, overall_total = create_visualization(
         parameter_stats,
-        args.output
+        args.output,
+        intervals
     )
 
-    print_summary_table(parameter_stats)
+    print_summary_table(parameter_stats, intervals)
+    print_confusion_table(confusion)
 
     print(f"\n✓ Validation complete!")
     print(f"  Overall Accuracy: {overall_accuracy:.1f}% ({overall_correct}/{overall_total})")